@@ -0,0 +1,81 @@
+"""
+Задержка /api/v1/feed/ в зависимости от числа подписок читателя.
+
+    python -m benchmarks.feed --posts-per-author 20 --followings 1 10 100
+    python -m benchmarks.feed --backend timeline
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--followings', type=int, nargs='+', default=[1, 10, 100, 1000]
+    )
+    parser.add_argument('--posts-per-author', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--backend', choices=('query', 'timeline'), default='query'
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    from posts import timeline
+    from posts.models import Follow, Post
+
+    settings.FEED_BACKEND = args.backend
+
+    User = get_user_model()
+    authors_count = max(args.followings)
+    User.objects.bulk_create(
+        User(username=f'author{i}') for i in range(authors_count)
+    )
+    authors = list(User.objects.filter(username__startswith='author'))
+    Post.objects.bulk_create(
+        (
+            Post(text=f'Пост {i} автора {author.username}', author=author)
+            for author in authors
+            for i in range(args.posts_per_author)
+        ),
+        batch_size=1000,
+    )
+
+    rows = []
+    for count in args.followings:
+        reader = User.objects.create(username=f'reader{count}')
+        Follow.objects.bulk_create(
+            (Follow(user=reader, following=author)
+             for author in authors[:count]),
+            batch_size=1000,
+        )
+        if timeline.enabled():
+            timeline.rebuild(reader.id)
+        client = APIClient()
+        client.force_authenticate(reader)
+        url = f'/api/v1/feed/?limit={args.limit}'
+        timing = measure(lambda: client.get(url), repeat=args.repeat)
+        rows.append((
+            count,
+            f'{timing["p50"]:.2f}',
+            f'{timing["p95"]:.2f}',
+            f'{timing["mean"]:.2f}',
+        ))
+
+    print(
+        f'GET /api/v1/feed/?limit={args.limit}, '
+        f'постов на автора: {args.posts_per_author}, '
+        f'FEED_BACKEND: {args.backend}'
+    )
+    print_table(('подписок', 'p50, мс', 'p95, мс', 'среднее, мс'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Скорость загрузки manage.py import_yatube.
+
+Генерирует NDJSON с группами, постами, комментариями и подписками
+и загружает его командой; печатает строк в секунду для загрузки
+и время пересчёта счётчиков.
+
+    python -m benchmarks.importer --posts 100000 --comments 200000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.utils import print_table, setup_django
+
+
+def write_dump(path, args):
+    users = [f'user{i}' for i in range(args.users)]
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(args.groups):
+            file.write(json.dumps({
+                'type': 'group', 'id': i + 1, 'title': f'Группа {i}',
+                'slug': f'group-{i}', 'description': 'Описание',
+            }) + '\n')
+        for i in range(args.posts):
+            file.write(json.dumps({
+                'type': 'post', 'id': i + 1, 'text': f'Пост {i}',
+                'author': random.choice(users),
+                'pub_date': '2023-01-01T12:00:00Z',
+                'group': random.randint(1, args.groups) if i % 2 else None,
+            }, ensure_ascii=False) + '\n')
+        for i in range(args.comments):
+            file.write(json.dumps({
+                'type': 'comment', 'text': f'Комментарий {i}',
+                'author': random.choice(users),
+                'post': random.randint(1, args.posts),
+                'created': '2023-01-02T12:00:00Z',
+            }, ensure_ascii=False) + '\n')
+        for _ in range(args.follows):
+            user, following = random.sample(users, 2)
+            file.write(json.dumps({
+                'type': 'follow', 'user': user, 'following': following,
+            }) + '\n')
+    return args.groups + args.posts + args.comments + args.follows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--follows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.management import call_command
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dump.ndjson')
+        total = write_dump(path, args)
+
+        start = time.perf_counter()
+        call_command(
+            'import_yatube', path, create_users=True, skip_reconcile=True,
+            batch_size=args.batch_size, stdout=io.StringIO(),
+        )
+        loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    call_command('reconcile_counters', stdout=io.StringIO())
+    reconciled = time.perf_counter() - start
+
+    print_table(
+        ('этап', 'строк', 'секунд', 'строк/с'),
+        [
+            ('загрузка', total, f'{loaded:.2f}', f'{total / loaded:.0f}'),
+            ('пересчёт счётчиков', '', f'{reconciled:.2f}', ''),
+        ],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+Нагрузочный сценарий: смесь запросов к API из нескольких потоков.
+
+Запросы идут по HTTP к запущенному серверу (только stdlib: http.client
+и threading) или, с --in-process, через тестовый клиент Django на
+тестовой БД, заполненной generate_yatube_data. Печатает число запросов,
+ошибки, p50/p95/p99 и пропускную способность по каждому виду запроса.
+
+    cd yatube_api
+    python manage.py generate_yatube_data --users 1000 --seed 1
+    python manage.py runserver --noreload
+    cd .. && python -m benchmarks.loadtest --url http://127.0.0.1:8000 \\
+        --duration 30 --concurrency 8
+
+    python -m benchmarks.loadtest --in-process --requests 2000
+    python -m benchmarks.loadtest --mix posts:list=1,feed=1
+"""
+import argparse
+import http.client
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.utils import percentile, print_table
+
+# вид запроса: (вес, нужна ли авторизация)
+SCENARIOS = {
+    'posts:list': (30, False),
+    'posts:detail': (20, False),
+    'comments:list': (15, False),
+    'groups:list': (5, False),
+    'feed': (10, True),
+    'follow:list': (5, True),
+    'posts:create': (5, True),
+    'comments:create': (5, True),
+}
+
+
+def build_request(name, rng, post_ids):
+    """
+    (метод, путь, тело) запроса вида name
+    """
+    post_id = rng.choice(post_ids)
+    if name == 'posts:list':
+        offset = rng.randrange(500)
+        return 'GET', f'/api/v1/posts/?limit=10&offset={offset}', None
+    if name == 'posts:detail':
+        return 'GET', f'/api/v1/posts/{post_id}/', None
+    if name == 'comments:list':
+        return 'GET', f'/api/v1/posts/{post_id}/comments/', None
+    if name == 'groups:list':
+        return 'GET', '/api/v1/groups/', None
+    if name == 'feed':
+        return 'GET', '/api/v1/feed/?limit=10', None
+    if name == 'follow:list':
+        return 'GET', '/api/v1/follow/', None
+    if name == 'posts:create':
+        return 'POST', '/api/v1/posts/', {'text': 'Нагрузочный пост'}
+    if name == 'comments:create':
+        return 'POST', f'/api/v1/posts/{post_id}/comments/', {
+            'text': 'Нагрузочный комментарий'
+        }
+    raise ValueError(name)
+
+
+class HTTPTransport:
+    """
+    Запросы по HTTP; у каждого потока своё keep-alive соединение
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(
+                self.netloc, timeout=30
+            )
+        try:
+            connection.request(method, self.prefix + path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, content
+
+
+class DjangoTransport:
+    """
+    Запросы через django.test.Client без сетевого стека
+    """
+
+    def __init__(self):
+        from django.test import Client
+
+        self.local = threading.local()
+        self.client_class = Client
+
+    def request(self, method, path, body=None, token=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.client_class(
+                raise_request_exception=False
+            )
+        extra = {'HTTP_ACCEPT': 'application/json'}
+        if token:
+            extra['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        response = client.generic(
+            method, path,
+            json.dumps(body) if body is not None else '',
+            content_type='application/json', **extra
+        )
+        return response.status_code, response.content
+
+
+def discover(transport, args):
+    """
+    id постов для запросов и JWT пользователей generate_yatube_data
+    """
+    status, content = transport.request(
+        'GET', f'/api/v1/posts/?limit={args.sample_posts}'
+    )
+    if status != 200:
+        raise SystemExit(f'GET /api/v1/posts/ вернул {status}')
+    data = json.loads(content)
+    posts = data['results'] if isinstance(data, dict) else data
+    post_ids = [post['id'] for post in posts]
+    if not post_ids:
+        raise SystemExit(
+            'Постов нет: заполните БД командой generate_yatube_data'
+        )
+    tokens = []
+    for i in range(args.users):
+        status, content = transport.request(
+            'POST', '/api/v1/jwt/create/',
+            {'username': f'{args.prefix}{i}', 'password': args.password},
+        )
+        if status == 200:
+            tokens.append(json.loads(content)['access'])
+    return post_ids, tokens
+
+
+def parse_mix(value):
+    """
+    'posts:list=3,feed=1' -> {'posts:list': 3.0, 'feed': 1.0}
+    """
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'Неизвестный запрос: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def worker(transport, index, args, names, weights, post_ids, tokens,
+           counter, deadline, results):
+    rng = random.Random(None if args.seed is None else args.seed + index)
+    token = tokens[index % len(tokens)] if tokens else None
+    samples = []
+    while True:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        if deadline is None and next(counter) >= args.requests:
+            break
+        name = rng.choices(names, cum_weights=weights)[0]
+        method, path, body = build_request(name, rng, post_ids)
+        start = time.perf_counter()
+        try:
+            status = transport.request(
+                method, path, body, token if SCENARIOS[name][1] else None
+            )[0]
+        except (OSError, http.client.HTTPException):
+            status = None
+        samples.append((name, time.perf_counter() - start, status))
+    results.extend(samples)
+
+
+def summarize(results, elapsed):
+    """
+    Строки отчёта по видам запросов и итоговая строка 'всего'
+    """
+    rows = []
+    groups = {}
+    for name, seconds, status in results:
+        groups.setdefault(name, []).append((seconds, status))
+    groups['всего'] = [(seconds, status) for _, seconds, status in results]
+    for name, samples in groups.items():
+        if not samples:
+            continue
+        timings = [seconds * 1000 for seconds, _ in samples]
+        errors = sum(
+            1 for _, status in samples if status is None or status >= 400
+        )
+        rows.append((
+            name, len(samples), errors,
+            f'{percentile(timings, 50):.1f}',
+            f'{percentile(timings, 95):.1f}',
+            f'{percentile(timings, 99):.1f}',
+            f'{len(samples) / elapsed:.1f}',
+        ))
+    return rows
+
+
+def report(results, elapsed):
+    print_table(
+        ('запрос', 'всего', 'ошибок', 'p50 мс', 'p95 мс', 'p99 мс', 'зап/с'),
+        summarize(results, elapsed),
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument(
+        '--in-process', action='store_true',
+        help='Тестовый клиент Django на тестовой БД вместо HTTP',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=None,
+        help='Потоков; по умолчанию 4, с --in-process 1: общая БД '
+             'SQLite в памяти не выдерживает параллельной записи',
+    )
+    parser.add_argument(
+        '--duration', type=float, default=None,
+        help='Секунд нагрузки; иначе --requests запросов',
+    )
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument(
+        '--mix', type=parse_mix, default=None,
+        help='Веса запросов, например posts:list=3,feed=1; '
+             'по умолчанию: %s' % ', '.join(
+                 f'{name}={weight}'
+                 for name, (weight, _) in SCENARIOS.items()
+             ),
+    )
+    parser.add_argument(
+        '--users', type=int, default=20,
+        help='Сколько пользователей generate_yatube_data авторизовать',
+    )
+    parser.add_argument('--prefix', default='user')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--sample-posts', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument(
+        '--generate-users', type=int, default=200,
+        help='Размер данных для --in-process',
+    )
+    parser.add_argument('--generate-posts-per-user', type=int, default=10)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if args.concurrency is None:
+        args.concurrency = 1 if args.in_process else 4
+    if args.in_process:
+        from benchmarks.utils import setup_django
+
+        setup_django()
+
+        from django.core.management import call_command
+
+        call_command(
+            'generate_yatube_data', users=args.generate_users,
+            posts_per_user=args.generate_posts_per_user, seed=args.seed,
+            prefix=args.prefix, password=args.password, stdout=io.StringIO(),
+        )
+        transport = DjangoTransport()
+    else:
+        transport = HTTPTransport(args.url)
+
+    post_ids, tokens = discover(transport, args)
+    mix = args.mix or {
+        name: weight for name, (weight, _) in SCENARIOS.items()
+    }
+    if not tokens:
+        print('Нет JWT: запросы с авторизацией исключены')
+        mix = {name: weight for name, weight in mix.items()
+               if not SCENARIOS[name][1]}
+    names = list(mix)
+    weights = list(itertools.accumulate(mix[name] for name in names))
+
+    counter = itertools.count()
+    deadline = None
+    results = []
+    start = time.perf_counter()
+    if args.duration is not None:
+        deadline = start + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            transport, index, args, names, weights, post_ids, tokens,
+            counter, deadline, results,
+        ))
+        for index in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+JSONRenderer (json) против api.renderers.FastJSONRenderer (orjson)
+на страницах постов разного размера.
+
+    python -m benchmarks.renderers --limits 100 1000 10000
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--limits', type=int, nargs='+', default=[100, 1000, 10000]
+    )
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from api import renderers
+    from api.fast_serializers import FastPostSerializer
+    from posts.models import Post
+
+    if renderers.orjson is None:
+        print('orjson не установлен: FastJSONRenderer использует json')
+
+    User = get_user_model()
+    author = User.objects.create(username='author')
+    Post.objects.bulk_create(
+        (
+            Post(
+                text=f'Пост {i} ' + 'текст ' * 50, author=author,
+                image='posts/image.jpg' if i % 3 else '',
+            )
+            for i in range(max(args.limits))
+        ),
+        batch_size=1000,
+    )
+    request = Request(APIRequestFactory().get('/api/v1/posts/'))
+    serializer = FastPostSerializer(request)
+
+    rows = []
+    for limit in args.limits:
+        data = serializer.serialize(
+            serializer.values(Post.objects.all()[:limit])
+        )
+        size = len(JSONRenderer().render(data))
+        json_timing = measure(
+            lambda: JSONRenderer().render(data), repeat=args.repeat
+        )
+        fast_timing = measure(
+            lambda: renderers.FastJSONRenderer().render(data),
+            repeat=args.repeat,
+        )
+        rows.append((
+            limit,
+            f'{size / 1024:.0f}',
+            f'{json_timing["p50"]:.2f}',
+            f'{fast_timing["p50"]:.2f}',
+            f'{json_timing["p50"] / fast_timing["p50"]:.1f}x',
+        ))
+
+    print('p50, мс')
+    print_table(('постов', 'КиБ', 'json', 'orjson', 'ускорение'), rows)
+
+
+if __name__ == '__main__':
+    main()
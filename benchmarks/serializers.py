@@ -0,0 +1,94 @@
+"""
+Сериализаторы DRF против api.fast_serializers на списках постов.
+
+Замеряются выборка и сериализация страницы (без HTTP) и полный
+GET /api/v1/posts/?limit=N при выключенном и включённом
+API_FAST_SERIALIZERS.
+
+    python -m benchmarks.serializers --limits 10 100 500
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--limits', type=int, nargs='+', default=[10, 100, 500]
+    )
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from rest_framework.request import Request
+    from rest_framework.test import APIClient, APIRequestFactory
+
+    from api.fast_serializers import FastPostSerializer
+    from api.serializers import PostSerializer
+    from posts.models import Group, Post
+
+    User = get_user_model()
+    author = User.objects.create(username='author')
+    group = Group.objects.create(title='Группа', slug='group')
+    Post.objects.bulk_create(
+        (
+            Post(
+                text=f'Пост {i}', author=author,
+                group=group if i % 2 else None,
+                image='posts/image.jpg' if i % 3 else '',
+            )
+            for i in range(max(args.limits))
+        ),
+        batch_size=1000,
+    )
+    queryset = Post.objects.select_related('author')
+    client = APIClient()
+
+    rows = []
+    for limit in args.limits:
+        request = Request(APIRequestFactory().get('/api/v1/posts/'))
+        page = queryset[:limit]
+
+        def drf():
+            return PostSerializer(
+                list(page), many=True, context={'request': request}
+            ).data
+
+        def fast():
+            serializer = FastPostSerializer(request)
+            return serializer.serialize(serializer.values(page, 'pk'))
+
+        url = f'/api/v1/posts/?limit={limit}'
+
+        def endpoint(enabled):
+            settings.API_FAST_SERIALIZERS = enabled
+            return measure(lambda: client.get(url), repeat=args.repeat)
+
+        timings = (
+            measure(drf, repeat=args.repeat),
+            measure(fast, repeat=args.repeat),
+            endpoint(False),
+            endpoint(True),
+        )
+        rows.append((
+            limit,
+            *(f'{timing["p50"]:.2f}' for timing in timings),
+            f'{timings[0]["p50"] / timings[1]["p50"]:.1f}x',
+        ))
+
+    print('p50, мс')
+    print_table(
+        (
+            'limit', 'DRF', 'fast', 'GET (DRF)', 'GET (fast)',
+            'ускорение',
+        ),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Общие функции бенчмарков: настройка Django на тестовой БД и замеры.
+
+Бенчмарки запускаются из корня репозитория: python -m benchmarks.<имя>
+"""
+import math
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """
+    Подключает проект и создаёт чистую тестовую БД
+    (для SQLite - в памяти), рабочая БД не затрагивается
+    """
+    sys.path.insert(0, os.path.join(BASE_DIR, 'yatube_api'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    settings.ALLOWED_HOSTS = ['*']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def percentile(values, percent):
+    """
+    Перцентиль методом ближайшего ранга: p50 из [1, 2] - 1
+    """
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def measure(func, repeat=50, warmup=3):
+    """
+    Время выполнения func в миллисекундах: p50, p95 и среднее
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'mean': statistics.mean(timings),
+    }
+
+
+def print_table(header, rows):
+    widths = [
+        max(len(str(row[i])) for row in [header, *rows])
+        for i in range(len(header))
+    ]
+    for row in [header, *rows]:
+        print('  '.join(
+            str(cell).rjust(width) for cell, width in zip(row, widths)
+        ))
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from api import metrics
+from api.cache import get_cache, get_or_compute
+
+
+class TestGetOrCompute:
+
+    def test_coalesced_misses(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        before = metrics.snapshot().get('api_cache.coalesced', 0)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute('key', compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == ['value'] * 5
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные промахи по одному ключу '
+            'вычисляют значение один раз.'
+        )
+        assert metrics.snapshot()['api_cache.coalesced'] - before == 4, (
+            'Проверьте, что объединённые запросы учитываются в метриках.'
+        )
+
+    def test_none_not_cached(self):
+        assert get_or_compute('key', lambda: None) is None
+        assert get_cache().get('key') is None
+        assert get_or_compute('key', lambda: 'value') == 'value'
+
+    def test_waiter_stops_when_lock_released(self, settings):
+        settings.API_CACHE_LOCK_TIMEOUT = 5
+        # значение вычисляет другой процесс, и ответ не кэшируется
+        get_cache().add('key:lock', 1)
+        timer = threading.Timer(0.1, get_cache().delete, ('key:lock', ))
+        timer.start()
+        start = time.monotonic()
+        assert get_or_compute('key', lambda: 'value') == 'value'
+        timer.join()
+        assert time.monotonic() - start < 1, (
+            'Проверьте, что запрос перестаёт ждать значение, когда '
+            'блокировка снята без записи в кэш.'
+        )
+
+    def test_early_refresh(self, settings):
+        get_or_compute('key', lambda: 'old', timeout=60)
+        settings.API_CACHE_EARLY_REFRESH_BETA = 0
+        assert get_or_compute('key', lambda: 'new') == 'old'
+
+        value, delta, expires = get_cache().get('key')
+        get_cache().set('key', (value, 10, expires), 60)
+        settings.API_CACHE_EARLY_REFRESH_BETA = 1000
+        assert get_or_compute('key', lambda: 'new') == 'new', (
+            'Проверьте, что горячий ключ с долгим вычислением '
+            'пересчитывается до истечения срока.'
+        )
+
+    def test_early_refresh_single_worker(self, settings):
+        get_or_compute('key', lambda: 'old', timeout=60)
+        value, _, expires = get_cache().get('key')
+        get_cache().set('key', (value, 10, expires), 60)
+        settings.API_CACHE_EARLY_REFRESH_BETA = 1000
+        # пересчёт уже идёт в другом процессе
+        get_cache().add('key:lock', 1)
+        assert get_or_compute('key', lambda: 'new') == 'old', (
+            'Проверьте, что во время досрочного пересчёта остальные '
+            'запросы получают старое значение.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostCache:
+
+    @pytest.fixture(autouse=True)
+    def local_cache(self, settings):
+        # один процесс: кэш в памяти допустим
+        settings.API_CACHE_ALLOW_LOCAL = True
+
+    def test_post_list_cached(self, client, user_client, post):
+        url = '/api/v1/posts/'
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 0, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся '
+            'из кэша без запросов к БД.'
+        )
+
+        user_client.patch(f'{url}{post.id}/', data={'text': 'Новый текст'})
+        assert client.get(url).json()[0]['text'] == 'Новый текст', (
+            'Проверьте, что изменение поста сбрасывает кэш списка постов.'
+        )
+        user_client.delete(f'{url}{post.id}/')
+        assert client.get(url).json() == []
+
+    def test_comment_keeps_post_list(self, client, user_client, post,
+                                     another_post):
+        url = '/api/v1/posts/'
+        detail_url = f'{url}{post.id}/'
+        client.get(url)
+        client.get(detail_url)
+        user_client.post(f'{detail_url}comments/', data={'text': 'Коммент'})
+
+        assert client.get(detail_url).json()['comments_count'] == 1, (
+            'Проверьте, что новый комментарий сбрасывает кэш поста.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что комментарий не сбрасывает кэш всех '
+            f'списков `{url}`.'
+        )
+
+    def test_local_cache_not_used(self, client, post, settings):
+        settings.API_CACHE_ALLOW_LOCAL = False
+        url = '/api/v1/posts/'
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert context.captured_queries, (
+            'Проверьте, что ответы не кэшируются в памяти процесса '
+            '(LocMemCache): другие процессы не сбрасывают такой кэш.'
+        )
@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from api.views import CommentViewSet
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCommentCache:
+
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    @pytest.fixture(autouse=True)
+    def local_cache(self, settings):
+        # один процесс: кэш в памяти допустим
+        settings.API_CACHE_ALLOW_LOCAL = True
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), len(context.captured_queries)
+
+    def test_thread_cached(self, client, post, comment_1_post):
+        url = self.comments_url.format(post_id=post.id)
+        cold, cold_queries = self.get(client, url)
+        warm, warm_queries = self.get(client, url)
+        assert cold_queries and warm == cold and warm_queries == 0, (
+            f'Проверьте, что повторный GET-запрос к `{self.comments_url}` '
+            'отдаёт комментарии из кэша без запросов к БД.'
+        )
+
+    def test_writes_invalidate_thread(self, user_client, post, another_post,
+                                      comment_1_post, comment_1_another_post):
+        url = self.comments_url.format(post_id=post.id)
+        other_url = self.comments_url.format(post_id=another_post.id)
+        self.get(user_client, url)
+        self.get(user_client, other_url)
+
+        response = user_client.post(url, data={'text': 'Новый'})
+        assert response.status_code == 201
+        data, _ = self.get(user_client, url)
+        assert [item['text'] for item in data][-1] == 'Новый', (
+            'Проверьте, что новый комментарий сразу появляется в ответе '
+            f'на GET-запрос к `{self.comments_url}`.'
+        )
+        _, queries = self.get(user_client, other_url)
+        assert queries == 0, (
+            'Проверьте, что комментарий к одному посту не сбрасывает '
+            'кэш комментариев других постов.'
+        )
+
+        detail_url = f'{url}{comment_1_post.id}/'
+        user_client.patch(detail_url, data={'text': 'Изменённый'})
+        data, _ = self.get(user_client, url)
+        assert data[0]['text'] == 'Изменённый', (
+            'Проверьте, что изменение комментария сбрасывает кэш ветки.'
+        )
+
+        user_client.delete(detail_url)
+        data, _ = self.get(user_client, url)
+        assert comment_1_post.id not in [item['id'] for item in data], (
+            'Проверьте, что удаление комментария сбрасывает кэш ветки.'
+        )
+
+    def test_author_rename_invalidates_thread(self, client, post, user,
+                                              comment_1_post):
+        url = self.comments_url.format(post_id=post.id)
+        self.get(client, url)
+        user.username = 'renamed'
+        user.save()
+        data, _ = self.get(client, url)
+        assert data[0]['author'] == 'renamed'
+
+    def test_other_user_writes_keep_thread(self, client, post, user,
+                                           another_user, comment_1_post,
+                                           django_user_model):
+        url = self.comments_url.format(post_id=post.id)
+        self.get(client, url)
+        django_user_model.objects.create_user(username='Newcomer')
+        another_user.last_name = 'Другая фамилия'
+        another_user.save()
+        _, queries = self.get(client, url)
+        assert queries == 0, (
+            'Проверьте, что создание пользователя и изменения без смены '
+            f'имени не сбрасывают кэш `{self.comments_url}`.'
+        )
+
+    def test_cold_thread_single_computation(self, client, post,
+                                            comment_1_post, monkeypatch):
+        url = self.comments_url.format(post_id=post.id)
+        calls = []
+        paginate_queryset = CommentViewSet.paginate_queryset
+
+        def slow_paginate_queryset(view, queryset):
+            calls.append(1)
+            time.sleep(0.2)
+            return paginate_queryset(view, queryset)
+
+        monkeypatch.setattr(
+            CommentViewSet, 'paginate_queryset', slow_paginate_queryset
+        )
+        responses = []
+
+        def request():
+            responses.append(client.get(url))
+            connection.close()
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [response.status_code for response in responses] == [200] * 5
+        assert len(calls) == 1, (
+            f'Проверьте, что одновременные GET-запросы к `{url}` при '
+            'холодном кэше загружают комментарии из БД один раз.'
+        )
@@ -0,0 +1,136 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Comment
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def assert_not_modified(self, client, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, **headers)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным валидатором '
+            'возвращает ответ со статусом 304.'
+        )
+        assert len(context.captured_queries) <= 1, (
+            f'Проверьте, что ответ 304 на GET-запрос к `{url}` не '
+            'загружает список, а только проверяет валидаторы.'
+        )
+        return response
+
+    def test_post_list_etag(self, user_client, client, post, user):
+        response = client.get(self.post_list_url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.post_list_url}` '
+            'содержит заголовки `ETag` и `Last-Modified`.'
+        )
+        response = self.assert_not_modified(
+            client, self.post_list_url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.get('ETag') == etag
+
+        user_client.patch(
+            f'{self.post_list_url}{post.id}/', data={'text': 'Новый текст'}
+        )
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения поста GET-запрос к '
+            f'`{self.post_list_url}` со старым `If-None-Match` '
+            'возвращает ответ со статусом 200.'
+        )
+        etag = response.get('ETag')
+
+        Comment.objects.create(post=post, author=user, text='Коммент')
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий (поле `comments_count`) '
+            f'меняет `ETag` ответа на GET-запрос к `{self.post_list_url}`.'
+        )
+
+    def test_post_list_etag_after_delete(self, user_client, client, post,
+                                         another_post):
+        etag = client.get(self.post_list_url).get('ETag')
+        user_client.delete(f'{self.post_list_url}{post.id}/')
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления поста GET-запрос к '
+            f'`{self.post_list_url}` со старым `If-None-Match` '
+            'возвращает ответ со статусом 200.'
+        )
+
+    def test_validators_from_database(self, client, post, another_post,
+                                      monkeypatch):
+        from api.views import PostViewSet
+
+        # запись в другом процессе: версии в его кэше здесь не видны
+        monkeypatch.setattr('api.signals.bump_version', lambda *args: None)
+        monkeypatch.setattr(PostViewSet, 'cache_actions', ())
+        etag = client.get(self.post_list_url).get('ETag')
+
+        post.text = 'Правка из другого процесса'
+        post.save()
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что валидаторы списка постов считаются по БД '
+            'и меняются при правке поста в другом процессе.'
+        )
+        etag = response.get('ETag')
+
+        post.delete()
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что валидаторы списка постов считаются по БД '
+            'и меняются при удалении поста в другом процессе.'
+        )
+
+    def test_post_list_etag_depends_on_query(self, client, post):
+        etag = client.get(self.post_list_url).get('ETag')
+        response = client.get(
+            f'{self.post_list_url}?limit=1', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_post_list_last_modified(self, client, post, user_client):
+        response = client.get(self.post_list_url)
+        last_modified = response.get('Last-Modified')
+        self.assert_not_modified(
+            client, self.post_list_url,
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        response = client.get(
+            self.post_list_url,
+            HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_comment_list_etag(self, client, post, another_post,
+                               comment_1_post, user):
+        url = self.comments_url.format(post_id=post.id)
+        etag = client.get(url).get('ETag')
+        assert etag
+        self.assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etag)
+
+        Comment.objects.create(post=another_post, author=user, text='Другой')
+        other_url = self.comments_url.format(post_id=another_post.id)
+        assert client.get(other_url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        )
+
+        comment_1_post.text = 'Изменённый комментарий'
+        comment_1_post.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения комментария GET-запрос к '
+            f'`{self.comments_url}` со старым `If-None-Match` возвращает '
+            'ответ со статусом 200.'
+        )
+        assert response.json()[0]['text'] == 'Изменённый комментарий'
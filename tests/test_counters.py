@@ -0,0 +1,148 @@
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from posts.models import Comment, Follow, Post, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_comments_count(self, user_client, post, comment_1_post):
+        url = self.post_detail_url.format(post_id=post.id)
+        assert user_client.get(url).json()['comments_count'] == 1, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит поле '
+            '`comments_count` с количеством комментариев поста.'
+        )
+
+        response = user_client.post(
+            self.comments_url.format(post_id=post.id), data={'text': 'Ещё'}
+        )
+        assert user_client.get(url).json()['comments_count'] == 2, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comments_count` поста.'
+        )
+
+        user_client.delete(
+            f'{self.comments_url.format(post_id=post.id)}'
+            f'{response.json()["id"]}/'
+        )
+        assert user_client.get(url).json()['comments_count'] == 1, (
+            'Проверьте, что удаление комментария уменьшает '
+            '`comments_count` поста.'
+        )
+
+    def test_user_stats(self, user, another_user, post, comment_1_post):
+        follow = Follow.objects.create(user=user, following=another_user)
+        assert UserStats.objects.get(user=user).following_count == 1
+        assert UserStats.objects.get(user=another_user).followers_count == 1
+        assert UserStats.objects.get(user=user).posts_count == 1, (
+            'Проверьте, что создание поста увеличивает `posts_count` автора.'
+        )
+
+        follow.delete()
+        post.delete()
+        stats = UserStats.objects.get(user=user)
+        assert (stats.following_count, stats.posts_count) == (0, 0), (
+            'Проверьте, что удаление подписки и поста уменьшает счётчики '
+            'пользователя.'
+        )
+        assert UserStats.objects.get(user=another_user).followers_count == 0
+
+    def test_delete_after_drift(self, user_client, user, another_user,
+                                post):
+        Comment.objects.bulk_create([
+            Comment(post=post, author=user, text='Без сигналов')
+        ])
+        comment = Comment.objects.get(post=post)
+        response = user_client.delete(
+            f'{self.comments_url.format(post_id=post.id)}{comment.id}/'
+        )
+        assert response.status_code == 204, (
+            'Проверьте, что комментарий, добавленный без сигналов, '
+            'удаляется без ошибки.'
+        )
+        post.refresh_from_db()
+        assert post.comments_count == 0, (
+            'Проверьте, что уменьшение счётчика не опускает его ниже нуля.'
+        )
+
+        Follow.objects.bulk_create([Follow(user=user, following=another_user)])
+        Follow.objects.get(user=user).delete()
+        assert UserStats.objects.get(user=user).following_count == 0
+
+    def test_failed_delete_keeps_counter(self, user_client, user, post,
+                                         comment_1_post):
+        from django.db import DatabaseError
+        from django.db.models.signals import post_delete
+
+        def fail(sender, **kwargs):
+            raise DatabaseError('Удаление не удалось')
+
+        # удаление падает на каскадном удалении комментариев
+        post_delete.connect(fail, sender=Comment)
+        try:
+            with pytest.raises(DatabaseError):
+                user_client.delete(
+                    self.post_detail_url.format(post_id=post.id)
+                )
+        finally:
+            post_delete.disconnect(fail, sender=Comment)
+
+        Comment.objects.create(post=post, author=user, text='Ещё')
+        post.refresh_from_db()
+        assert post.comments_count == 2, (
+            'Проверьте, что после неудачного удаления поста его '
+            'счётчик комментариев продолжает обновляться.'
+        )
+
+    def test_reconcile_counters(self, user, another_user, post,
+                                comment_1_post, follow_1):
+        Post.objects.update(comments_count=0)
+        UserStats.objects.all().delete()
+        Comment.objects.bulk_create([
+            Comment(post=post, author=another_user, text='Без сигналов')
+        ])
+
+        call_command('reconcile_counters', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        assert post.comments_count == 2, (
+            'Проверьте, что команда `reconcile_counters` пересчитывает '
+            '`comments_count` постов.'
+        )
+        stats = UserStats.objects.get(user=user)
+        assert (
+            stats.posts_count, stats.following_count, stats.followers_count
+        ) == (1, 1, 0), (
+            'Проверьте, что команда `reconcile_counters` пересчитывает '
+            'статистику пользователей.'
+        )
+        assert UserStats.objects.get(user=another_user).followers_count == 1
+
+    def test_user_stats_endpoint(self, client, user, another_user, post,
+                                 post_2, follow_1):
+        url = f'/api/v1/users/{user.username}/'
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` доступен без авторизации.'
+        )
+        assert response.json() == {
+            'username': user.username,
+            'posts_count': 2,
+            'followers_count': 0,
+            'following_count': 1,
+        }, (
+            f'Проверьте, что `{url}` возвращает счётчики постов, '
+            'подписчиков и подписок пользователя.'
+        )
+        data = client.get(f'/api/v1/users/{another_user.username}/').json()
+        assert data['followers_count'] == 1
+
+        UserStats.objects.all().delete()
+        data = client.get(url).json()
+        assert data['posts_count'] == 0
+        assert client.get('/api/v1/users/missing/').status_code == 404
@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+import pytest
+
+from posts.models import Comment, Post
+
+
+def parse_lines(content):
+    return [json.loads(line) for line in content.splitlines() if line]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExport:
+
+    url = '/api/v1/export/'
+
+    @pytest.fixture
+    def admin_client(self, user, user_client):
+        user.is_staff = True
+        user.save()
+        return user_client
+
+    def get_lines(self, client, params=''):
+        response = client.get(self.url + params)
+        assert response.status_code == 200, (
+            f'Проверьте, что администратору доступен `{self.url}`.'
+        )
+        assert response.streaming, (
+            f'Проверьте, что `{self.url}` отдаёт выгрузку потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        return parse_lines(b''.join(response.streaming_content).decode())
+
+    def test_export(self, admin_client, post, another_post, comment_1_post,
+                    settings):
+        settings.EXPORT_CHUNK_SIZE = 1
+        lines = self.get_lines(admin_client)
+        assert [(line['type'], line['id']) for line in lines] == [
+            ('post', post.id), ('post', another_post.id),
+            ('comment', comment_1_post.id),
+        ], (
+            f'Проверьте, что `{self.url}` выгружает посты, затем '
+            'комментарии, по одному объекту JSON в строке.'
+        )
+        assert lines[0]['author'] == post.author.username
+        assert lines[0]['text'] == post.text
+        assert lines[2]['post'] == post.id
+
+    def test_filters(self, admin_client, post, another_post, comment_1_post,
+                     comment_1_another_post):
+        lines = self.get_lines(admin_client, '?models=posts&group=' + (
+            another_post.group.slug
+        ))
+        assert [line['id'] for line in lines] == [another_post.id], (
+            'Проверьте, что выгрузку можно ограничить группой.'
+        )
+        lines = self.get_lines(
+            admin_client,
+            f'?models=comments&author={comment_1_post.author.username}'
+        )
+        assert {line['id'] for line in lines} == {
+            comment_1_post.id, comment_1_another_post.id
+        }
+
+        old = timezone.now() - timedelta(days=10)
+        Post.objects.filter(id=post.id).update(pub_date=old)
+        since = (old + timedelta(days=1)).date().isoformat()
+        lines = self.get_lines(admin_client, f'?models=posts&since={since}')
+        assert [line['id'] for line in lines] == [another_post.id], (
+            'Проверьте, что выгрузку можно ограничить датой.'
+        )
+        lines = self.get_lines(admin_client, f'?models=posts&until={since}')
+        assert [line['id'] for line in lines] == [post.id]
+
+        for params in ('?since=вчера', '?models=users'):
+            response = admin_client.get(self.url + params)
+            assert response.status_code == 400
+
+    def test_admin_only(self, client, user_client):
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403, (
+            f'Проверьте, что `{self.url}` доступен только администратору.'
+        )
+
+    def test_command(self, post, comment_1_post, comment_2_post, tmp_path):
+        output = tmp_path / 'export.ndjson'
+        call_command('export_yatube', output=str(output), chunk_size=1)
+        lines = parse_lines(output.read_text())
+        assert [line['type'] for line in lines] == [
+            'post', 'comment', 'comment'
+        ], (
+            'Проверьте, что команда `export_yatube` выгружает посты '
+            'и комментарии.'
+        )
+        assert Comment.objects.count() == 2
+
+        with pytest.raises(CommandError):
+            call_command('export_yatube', since='вчера')
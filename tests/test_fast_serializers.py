@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.utils import timezone
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFastSerializers:
+
+    def get_both(self, client, url, settings):
+        settings.API_FAST_SERIALIZERS = False
+        expected = client.get(url)
+        # ответы /groups/ кэшируются
+        cache.clear()
+        settings.API_FAST_SERIALIZERS = True
+        response = client.get(url)
+        assert expected.status_code == response.status_code == 200
+        return expected.content, response.content
+
+    def test_same_output(self, user_client, settings, post, another_post,
+                         comment_1_post, comment_2_post, group_1, group_2,
+                         follow_1, follow_2):
+        Post.objects.filter(id=post.id).update(image='posts/image.jpg')
+        Post.objects.filter(id=another_post.id).update(group=None)
+        urls = (
+            '/api/v1/posts/',
+            '/api/v1/posts/?limit=1&offset=1',
+            '/api/v1/posts/?cursor=&limit=1',
+            '/api/v1/posts/?fields=id,image,group',
+            f'/api/v1/posts/{post.id}/comments/',
+            f'/api/v1/posts/{post.id}/comments/?omit=text',
+            '/api/v1/groups/',
+            '/api/v1/follow/',
+            '/api/v1/feed/',
+        )
+        for url in urls:
+            expected, content = self.get_both(user_client, url, settings)
+            assert content == expected, (
+                f'Проверьте, что быстрая сериализация ответа на GET-запрос '
+                f'к `{url}` совпадает с сериализаторами DRF байт в байт.'
+            )
+
+    def test_same_output_in_current_timezone(self, client, settings, post):
+        url = '/api/v1/posts/'
+        with timezone.override('Europe/Moscow'):
+            expected, content = self.get_both(client, url, settings)
+        assert content == expected, (
+            'Проверьте, что быстрая сериализация переводит даты '
+            'в текущий часовой пояс, как DateTimeField.'
+        )
+        assert b'+03:00' in content
+
+    def test_keyset_cursor(self, client, settings, post, post_2):
+        settings.API_FAST_SERIALIZERS = True
+        response = client.get('/api/v1/posts/?cursor=&limit=1')
+        data = response.json()
+        assert data['results'][0]['id'] == post_2.id
+        data = client.get(data['next']).json()
+        assert [item['id'] for item in data['results']] == [post.id], (
+            'Проверьте, что курсор пагинации строится по строкам '
+            'быстрой сериализации.'
+        )
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+from rest_framework.test import APIClient
+
+from posts.models import Follow, Post, TimelineEntry
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    url = '/api/v1/feed/'
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_feed_only_followings(self, user_client, user, follow_1,
+                                  another_user, user_2):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author)
+            for i, author in enumerate((user, another_user, user_2) * 4)
+        )
+        expected_ids = list(
+            Post.objects.filter(author=another_user).values_list(
+                'id', flat=True
+            )
+        )
+
+        url = f'{self.url}?limit=3'
+        received_ids = []
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что GET-запрос авторизованного пользователя к '
+                f'`{self.url}` возвращает ответ со статусом 200.'
+            )
+            test_data = response.json()
+            received_ids += [item['id'] for item in test_data['results']]
+            url = test_data['next']
+
+        assert received_ids == expected_ids, (
+            f'Проверьте, что `{self.url}` возвращает только посты авторов, '
+            'на которых подписан пользователь, от новых к старым.'
+        )
+
+    def test_feed_single_query(self, user_client, user, follow_1,
+                               another_user):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=another_user) for i in range(5)
+        )
+        user_client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(self.url)
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что `{self.url}` собирает ленту одним запросом '
+            'к БД.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTimelineFeed:
+
+    url = '/api/v1/feed/'
+
+    @pytest.fixture(autouse=True)
+    def timeline_backend(self, settings):
+        settings.FEED_BACKEND = 'timeline'
+        settings.TIMELINE_MAX_LENGTH = 3
+        settings.TIMELINE_TRIM_SLACK = 1
+
+    def feed_ids(self, client):
+        return [item['id'] for item in client.get(self.url).json()['results']]
+
+    def test_timeline_follow_post_unfollow(self, user_client, user,
+                                           another_user):
+        old_posts = [
+            Post.objects.create(text=f'Старый пост {i}', author=another_user)
+            for i in range(4)
+        ]
+        user_client.post('/api/v1/follow/', data={
+            'following': another_user.username
+        })
+        assert TimelineEntry.objects.filter(user=user).count() == 3, (
+            'Проверьте, что при подписке в ленту пользователя добавляются '
+            'последние посты автора, не больше `TIMELINE_MAX_LENGTH`.'
+        )
+        assert self.feed_ids(user_client) == [
+            post.id for post in reversed(old_posts[1:])
+        ]
+
+        author_client = APIClient()
+        author_client.force_authenticate(another_user)
+        new_post_id = author_client.post(
+            '/api/v1/posts/', data={'text': 'Новый пост'}
+        ).json()['id']
+        assert TimelineEntry.objects.filter(user=user).count() == 3, (
+            'Проверьте, что длина ленты ограничивается '
+            '`TIMELINE_MAX_LENGTH` при раскладке поста, даже если '
+            'подписчик не читает ленту.'
+        )
+        assert self.feed_ids(user_client)[0] == new_post_id, (
+            'Проверьте, что новый пост сразу попадает в предвычисленные '
+            'ленты подписчиков автора.'
+        )
+        assert TimelineEntry.objects.filter(user=user).count() == 3, (
+            'Проверьте, что длина ленты ограничивается '
+            '`TIMELINE_MAX_LENGTH` при чтении.'
+        )
+
+        Follow.objects.filter(user=user).delete()
+        assert self.feed_ids(user_client) == [], (
+            'Проверьте, что после отписки посты автора удаляются из '
+            'предвычисленной ленты.'
+        )
+
+    def test_rebuild_timelines(self, user, follow_1, another_user):
+        post = Post.objects.create(text='Пост', author=another_user)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        assert list(
+            TimelineEntry.objects.filter(user=user).values_list(
+                'post_id', flat=True
+            )
+        ) == [post.id]
+
+    def test_trim_timelines(self, user, follow_1, another_user):
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=another_user)
+            for i in range(5)
+        ]
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=user, post=post, pub_date=post.pub_date)
+            for post in posts
+        )
+        call_command('trim_timelines', stdout=StringIO())
+        assert list(
+            TimelineEntry.objects.filter(user=user).order_by(
+                '-pub_date', '-post_id'
+            ).values_list('post_id', flat=True)
+        ) == [post.id for post in reversed(posts[2:])], (
+            'Проверьте, что `trim_timelines` оставляет в лентах '
+            '`TIMELINE_MAX_LENGTH` последних записей.'
+        )
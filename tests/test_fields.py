@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSparseFields:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), [
+            query['sql'] for query in context.captured_queries
+        ]
+
+    def test_post_fields(self, client, post):
+        url = '/api/v1/posts/?fields=id,author'
+        data, queries = self.get(client, url)
+        assert set(data[0]) == {'id', 'author'}, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит только '
+            'поля, перечисленные в параметре `fields`.'
+        )
+        assert '"posts_post"."text"' not in queries[-1], (
+            f'Проверьте, что GET-запрос к `{url}` не загружает из БД поля, '
+            'которых нет в ответе.'
+        )
+
+        url = f'/api/v1/posts/{post.id}/?omit=text,image'
+        data, queries = self.get(client, url)
+        assert 'text' not in data and 'image' not in data, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` не содержит '
+            'полей, перечисленных в параметре `omit`.'
+        )
+        assert data['author'] == post.author.username
+        assert '"posts_post"."text"' not in queries[-1]
+
+    def test_post_fields_without_author(self, client, post):
+        url = '/api/v1/posts/?cursor=&fields=text'
+        data, queries = self.get(client, url)
+        assert [set(item) for item in data['results']] == [{'text'}]
+        assert len(queries) == 2 and 'auth_user' not in queries[-1], (
+            f'Проверьте, что GET-запрос к `{url}` не присоединяет таблицу '
+            'авторов, если поле `author` не запрошено.'
+        )
+
+    def test_other_serializers_fields(self, user_client, post, group_1,
+                                      comment_1_post, follow_1):
+        urls = {
+            f'/api/v1/posts/{post.id}/comments/?fields=id,author': {
+                'id', 'author'
+            },
+            '/api/v1/groups/?omit=description': {'id', 'title', 'slug'},
+            '/api/v1/follow/?fields=following': {'following'},
+        }
+        for url, expected in urls.items():
+            data, queries = self.get(user_client, url)
+            assert set(data[0]) == expected, (
+                f'Проверьте, что GET-запрос к `{url}` поддерживает параметры '
+                '`fields` и `omit`.'
+            )
+
+    def test_fields_ignored_on_write(self, user_client):
+        response = user_client.post(
+            '/api/v1/posts/?fields=id', data={'text': 'Новый пост'}
+        )
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Новый пост', (
+            'Проверьте, что параметр `fields` не влияет на запросы, '
+            'изменяющие данные.'
+        )
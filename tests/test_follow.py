@@ -190,3 +190,64 @@ class TestFollowAPI:
             f'GET-запрос с параметром `search` к `{self.url}` содержит только '
             'те подписки, которые удовлетворяют параметрам поиска.'
         )
+
+    def test_follow_search_prefix_like(self, user_client, follow_1,
+                                       follow_5, monkeypatch):
+        from types import SimpleNamespace
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        # в PostgreSQL префикс ищется через LIKE: диапазон верен
+        # только при сортировке C
+        monkeypatch.setattr(
+            'api.filters.connection', SimpleNamespace(vendor='postgresql')
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(f'{self.url}?search=TestUser')
+        assert len(response.json()) == 2
+        assert any(
+            'LIKE' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что в PostgreSQL поиск по префиксу использует '
+            "`LIKE 'term%'` вместо диапазона."
+        )
+        assert user_client.get(f'{self.url}?search=user2').json() == []
+
+    def test_follow_search_modes(self, user_client, follow_1, follow_5,
+                                 user_2, another_user):
+        response = user_client.get(f'{self.url}?search=testuser')
+        assert len(response.json()) == 2, (
+            'Проверьте, что по умолчанию поиск по параметру `search` к '
+            f'`{self.url}` находит подписки по началу `username` без '
+            'учёта регистра.'
+        )
+
+        response = user_client.get(f'{self.url}?search=user2')
+        assert response.json() == [], (
+            'Проверьте, что в режиме поиска по префиксу GET-запрос к '
+            f'`{self.url}` не находит совпадения в середине `username`.'
+        )
+
+        response = user_client.get(
+            f'{self.url}?search=user2&search_mode=contains'
+        )
+        assert [item['following'] for item in response.json()] == [
+            user_2.username
+        ], (
+            'Проверьте, что параметр `search_mode=contains` включает поиск '
+            f'по вхождению подстроки для `{self.url}`.'
+        )
+
+        response = user_client.get(
+            f'{self.url}?search=testuser&search_mode=exact'
+        )
+        assert response.json() == [], (
+            'Проверьте, что параметр `search_mode=exact` включает поиск '
+            f'по точному совпадению для `{self.url}`.'
+        )
+        response = user_client.get(
+            f'{self.url}?search={another_user.username.upper()}'
+            '&search_mode=exact'
+        )
+        assert len(response.json()) == 1
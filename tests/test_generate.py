@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+import pytest
+
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateData:
+
+    def test_volumes(self, client):
+        call_command(
+            'generate_yatube_data', users=50, groups=3, posts_per_user=4,
+            comments=1000, follows=300, seed=1,
+        )
+        assert User.objects.count() == 50
+        assert Group.objects.count() == 3
+        assert Post.objects.count() == 200, (
+            'Проверьте, что `generate_yatube_data` создаёт '
+            '`--posts-per-user` постов каждому пользователю.'
+        )
+        assert Comment.objects.count() == 1000
+        assert Follow.objects.count() == 300
+        assert not Follow.objects.filter(user=F('following')).exists()
+
+        response = client.post(
+            '/api/v1/jwt/create/',
+            data={'username': 'user0', 'password': 'password'},
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что созданные пользователи могут получить JWT '
+            'с паролем `--password`.'
+        )
+
+    def test_power_law(self):
+        call_command(
+            'generate_yatube_data', users=100, posts_per_user=10,
+            comments=5000, follows=1000, seed=2,
+        )
+        counts = list(Post.objects.order_by(
+            '-comments_count'
+        ).values_list('comments_count', flat=True))
+        assert sum(counts) == 5000, (
+            'Проверьте, что после генерации пересчитываются счётчики.'
+        )
+        assert counts[0] > 20 * counts[len(counts) // 2], (
+            'Проверьте, что комментарии распределены по постам '
+            'по степенному закону.'
+        )
+        followers = list(UserStats.objects.order_by(
+            '-followers_count'
+        ).values_list('followers_count', flat=True))
+        assert followers[0] > 5 * followers[len(followers) // 2], (
+            'Проверьте, что подписчики распределены по авторам '
+            'по степенному закону.'
+        )
+
+    def test_repeat(self):
+        for _ in range(2):
+            call_command(
+                'generate_yatube_data', users=10, posts_per_user=2,
+                comments=10, follows=10,
+            )
+        assert User.objects.count() == 10
+        assert Post.objects.count() == 40, (
+            'Проверьте, что повторный запуск дополняет данные для тех же '
+            'пользователей.'
+        )
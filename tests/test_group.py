@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 from posts.models import Group
@@ -113,3 +115,56 @@ class TestGroupAPI:
             'виде словаря.'
         )
         self.check_group_info(test_data, '/api/v1/groups/{group_id}/')
+
+    def test_group_list_cached(self, client, group_1, settings):
+        settings.API_CACHE_ALLOW_LOCAL = True
+        client.get(self.group_url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.group_url)
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            f'Проверьте, что повторный GET-запрос к `{self.group_url}` '
+            'обслуживается из кэша без запросов к БД.'
+        )
+
+        group_1.title = 'Новое название'
+        group_1.save()
+        test_data = client.get(self.group_url).json()
+        assert test_data[0]['title'] == group_1.title, (
+            'Проверьте, что изменение группы сбрасывает кэш ответов '
+            f'`{self.group_url}`.'
+        )
+
+        group_1.delete()
+        response = client.get(
+            self.group_detail_url.format(group_id=group_1.id)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что удаление группы сбрасывает кэш ответов '
+            f'`{self.group_detail_url}`.'
+        )
+
+    def test_group_etag(self, client, group_1, settings):
+        settings.API_CACHE_ALLOW_LOCAL = True
+        url = self.group_detail_url.format(group_id=group_1.id)
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        group_1.description = 'Новое описание'
+        group_1.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения группы GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        assert response.get('ETag') != etag
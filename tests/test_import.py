@@ -0,0 +1,167 @@
+import json
+
+from django.core.management import CommandError, call_command
+import pytest
+
+from api.importer import import_files
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+
+def write_ndjson(path, rows):
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows) + '\n',
+        encoding='utf-8',
+    )
+    return str(path)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImport:
+
+    def test_import_ndjson(self, tmp_path, user, another_user):
+        path = write_ndjson(tmp_path / 'dump.ndjson', [
+            {'type': 'comment', 'text': 'Раньше поста', 'post': 10,
+             'author': another_user.username,
+             'created': '2020-01-02T10:00:00Z'},
+            {'type': 'group', 'title': 'Группа', 'slug': 'group',
+             'description': 'Описание'},
+            {'type': 'post', 'id': 10, 'text': 'Пост', 'group': 'group',
+             'author': user.username, 'pub_date': '2020-01-01T10:00:00Z'},
+            {'type': 'post', 'text': 'Без даты', 'author': user.username},
+            {'type': 'follow', 'user': another_user.username,
+             'following': user.username},
+        ])
+        call_command('import_yatube', path, batch_size=1)
+
+        post = Post.objects.get(id=10)
+        assert post.group == Group.objects.get(slug='group'), (
+            'Проверьте, что группа поста находится по slug.'
+        )
+        assert post.pub_date.isoformat() == '2020-01-01T10:00:00+00:00', (
+            'Проверьте, что команда `import_yatube` сохраняет дату '
+            'публикации из файла.'
+        )
+        comment = Comment.objects.get()
+        assert comment.post == post and comment.author == another_user, (
+            'Проверьте, что комментарий можно загрузить раньше его поста.'
+        )
+        assert comment.created.year == 2020
+        assert Post.objects.get(text='Без даты').pub_date.year > 2020
+        assert Follow.objects.filter(
+            user=another_user, following=user
+        ).exists()
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что после загрузки пересчитываются счётчики.'
+        )
+        assert UserStats.objects.get(user=user).followers_count == 1
+        assert UserStats.objects.get(user=user).posts_count == 2
+
+    def test_import_csv(self, tmp_path, user, group_1, client):
+        assert client.get('/api/v1/posts/').json() == []
+        path = tmp_path / 'posts.csv'
+        path.write_text(
+            'text,author,group,pub_date\n'
+            f'"Пост, с запятой",{user.username},{group_1.id},2021-05-01\n'
+            f'Второй,{user.username},,\n',
+            encoding='utf-8',
+        )
+        call_command('import_yatube', str(path))
+        assert list(Post.objects.order_by('pk').values_list(
+            'text', 'group'
+        )) == [('Пост, с запятой', group_1.id), ('Второй', None)], (
+            'Проверьте, что команда `import_yatube` загружает CSV, '
+            'определяя тип строк по имени файла.'
+        )
+        assert len(client.get('/api/v1/posts/').json()) == 2, (
+            'Проверьте, что загрузка сбрасывает кэш ответов API.'
+        )
+
+    def test_import_numeric_slug(self, tmp_path, user, group_1):
+        group = Group.objects.create(
+            title='Год', slug=str(group_1.id + 1), description='Описание'
+        )
+        path = tmp_path / 'posts.csv'
+        path.write_text(
+            'text,author,group\n'
+            f'По slug,{user.username},{group.slug}\n'
+            f'По id,{user.username},{group_1.id}\n',
+            encoding='utf-8',
+        )
+        call_command('import_yatube', str(path))
+        assert dict(Post.objects.values_list('text', 'group')) == {
+            'По slug': group.id, 'По id': group_1.id,
+        }, (
+            'Проверьте, что группа со slug из цифр находится по slug, '
+            'а не по id.'
+        )
+
+    def test_import_counts_skip_conflicts(self, tmp_path, user, follow_1,
+                                          group_1):
+        path = write_ndjson(tmp_path / 'dump.ndjson', [
+            {'type': 'group', 'title': 'Дубль', 'slug': group_1.slug},
+            {'type': 'group', 'title': 'Новая', 'slug': 'new'},
+            {'type': 'follow', 'user': follow_1.user.username,
+             'following': follow_1.following.username},
+        ])
+        counts = import_files([path])
+        assert counts['group'] == 1 and counts['follow'] == 0, (
+            'Проверьте, что в итогах загрузки не учитываются строки, '
+            'пропущенные из-за конфликта.'
+        )
+
+    def test_import_users(self, tmp_path, user):
+        path = write_ndjson(tmp_path / 'dump.ndjson', [
+            {'type': 'post', 'text': 'Пост', 'author': 'новый'},
+        ])
+        with pytest.raises(CommandError):
+            call_command('import_yatube', path)
+        assert not Post.objects.exists()
+
+        call_command('import_yatube', path, create_users=True)
+        post = Post.objects.get()
+        assert post.author.username == 'новый', (
+            'Проверьте, что с `--create-users` отсутствующие авторы '
+            'создаются.'
+        )
+        assert not post.author.has_usable_password()
+
+    def test_import_rollback(self, tmp_path, user):
+        path = write_ndjson(tmp_path / 'dump.ndjson', [
+            {'type': 'post', 'text': 'Пост', 'author': user.username},
+            {'type': 'comment', 'text': 'Комментарий', 'post': 999,
+             'author': user.username},
+        ])
+        with pytest.raises(CommandError):
+            call_command('import_yatube', path)
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке загрузка откатывается целиком.'
+        )
+
+        path = write_ndjson(tmp_path / 'bad.ndjson', [
+            {'type': 'post', 'author': user.username},
+        ])
+        with pytest.raises(CommandError, match='bad.ndjson:1'):
+            call_command('import_yatube', path)
+
+    def test_export_round_trip(self, tmp_path, post, another_post,
+                               comment_1_post, comment_2_post):
+        path = tmp_path / 'export.ndjson'
+        call_command('export_yatube', output=str(path))
+        before = list(Post.objects.values_list(
+            'id', 'text', 'author', 'group', 'pub_date'
+        )) + list(Comment.objects.values_list(
+            'id', 'text', 'author', 'post', 'created'
+        ))
+        Post.objects.all().delete()
+
+        call_command('import_yatube', str(path))
+        after = list(Post.objects.values_list(
+            'id', 'text', 'author', 'group', 'pub_date'
+        )) + list(Comment.objects.values_list(
+            'id', 'text', 'author', 'post', 'created'
+        ))
+        assert after == before, (
+            'Проверьте, что выгрузку `export_yatube` можно загрузить '
+            'обратно командой `import_yatube`.'
+        )
@@ -1,5 +1,9 @@
+from datetime import timedelta
 from http import HTTPStatus
+from io import StringIO
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 
@@ -142,3 +146,73 @@ class TestJWT:
                 f'отправленный к `{url}`, возвращает ответ со статусом 200. '
                 'Корректными данными считаются `refresh`- и `access`-токены.'
             )
+
+    def test_jwt_blacklisted_refresh_rejected(self, client, token,
+                                              settings):
+        from api.tokens import RefreshToken
+
+        settings.JWT_BLACKLIST_MODE = 'memory'
+        client.post(self.url_refresh, data={'refresh': token['refresh']})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                self.url_refresh, data={'refresh': token['refresh']}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            'Убедитесь, что при `JWT_BLACKLIST_MODE = "memory"` проверка '
+            f'отзыва токена на `{self.url_refresh}` не обращается к БД.'
+        )
+
+        RefreshToken(token['refresh']).blacklist()
+        for url, data in (
+            (self.url_refresh, {'refresh': token['refresh']}),
+            (self.url_verify, {'token': token['refresh']}),
+        ):
+            response = client.post(url, data=data)
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Убедитесь, что POST-запрос к `{url}` с отозванным '
+                'refresh-токеном возвращает ответ со статусом 401.'
+            )
+
+    def test_jwt_blacklist_database_mode(self, client, token):
+        from api.tokens import RefreshToken
+
+        RefreshToken(token['refresh']).blacklist()
+        response = client.post(
+            self.url_refresh, data={'refresh': token['refresh']}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Убедитесь, что по умолчанию (`JWT_BLACKLIST_MODE = '
+            f'"database"`) POST-запрос к `{self.url_refresh}` с отозванным '
+            'refresh-токеном возвращает ответ со статусом 401.'
+        )
+
+    def test_prune_tokens_command(self, user):
+        from django.core.management import call_command
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken,
+            OutstandingToken,
+        )
+
+        expired = [
+            OutstandingToken.objects.create(
+                user=user, jti=f'expired-{i}', token='token',
+                expires_at=timezone.now() - timedelta(days=1),
+            )
+            for i in range(5)
+        ]
+        BlacklistedToken.objects.create(token=expired[0])
+        OutstandingToken.objects.create(
+            user=user, jti='alive', token='token',
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        call_command('prune_tokens', batch_size=2, stdout=StringIO())
+        assert list(
+            OutstandingToken.objects.values_list('jti', flat=True)
+        ) == ['alive'], (
+            'Убедитесь, что команда `prune_tokens` удаляет только истёкшие '
+            'токены.'
+        )
+        assert not BlacklistedToken.objects.exists()
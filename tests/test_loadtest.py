@@ -0,0 +1,49 @@
+import argparse
+
+import pytest
+
+from benchmarks.loadtest import build_parser, parse_mix, summarize
+from benchmarks.utils import percentile
+
+
+class TestLoadtest:
+
+    def test_percentile(self):
+        assert percentile([2, 1], 50) == 1, (
+            'Проверьте, что p50 из двух значений - меньшее из них '
+            '(метод ближайшего ранга).'
+        )
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile(values, 0) == 1
+        assert percentile([7], 95) == 7
+
+    def test_parse_args(self):
+        args = build_parser().parse_args([
+            '--in-process', '--requests', '10',
+            '--mix', 'posts:list=3,feed',
+        ])
+        assert args.in_process and args.requests == 10
+        assert args.mix == {'posts:list': 3.0, 'feed': 1.0}
+        assert args.concurrency is None
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix('unknown=1')
+
+    def test_summarize(self):
+        results = [
+            ('posts:list', 0.010, 200),
+            ('posts:list', 0.030, 200),
+            ('feed', 0.020, 500),
+            ('feed', 0.040, None),
+        ]
+        rows = {row[0]: row for row in summarize(results, elapsed=2)}
+        assert rows['posts:list'] == (
+            'posts:list', 2, 0, '10.0', '30.0', '30.0', '1.0'
+        )
+        assert rows['feed'][:3] == ('feed', 2, 2), (
+            'Проверьте, что ответы 5xx и сетевые ошибки считаются ошибками.'
+        )
+        assert rows['всего'][:4] == ('всего', 4, 2, '20.0')
+        assert summarize([], elapsed=1) == []
@@ -127,6 +127,47 @@ class TestPostAPI:
             db_post=db_post
         )
 
+    def test_posts_keyset_paginated(self, user_client, user):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user) for i in range(5)
+        )
+        expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        url = f'{self.post_list_url}?cursor=&limit=2'
+        received_ids = []
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Убедитесь, что GET-запрос с параметром `cursor` к '
+                f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+            )
+            test_data = response.json()
+            assert len(test_data['results']) <= 2
+            received_ids += [item['id'] for item in test_data['results']]
+            url = test_data['next']
+        assert received_ids == expected_ids, (
+            'Убедитесь, что последовательный обход страниц по ссылкам `next` '
+            f'при курсорной пагинации `{self.post_list_url}` возвращает '
+            'все посты от новых к старым без пропусков и повторов.'
+        )
+
+        previous_page = user_client.get(
+            test_data['previous']
+        ).json()['results']
+        assert [item['id'] for item in previous_page] == expected_ids[2:4], (
+            'Убедитесь, что ссылка `previous` при курсорной пагинации '
+            'возвращает предыдущую страницу.'
+        )
+
+        response = user_client.get(f'{self.post_list_url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Убедитесь, что GET-запрос с некорректным курсором к '
+            f'`{self.post_list_url}` возвращает ответ со статусом 404.'
+        )
+
     def test_post_create_auth_with_invalid_data(self, user_client):
         posts_count = Post.objects.count()
         response = user_client.post(self.post_list_url, data={})
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+from posts.models import Follow, Post, TimelineEntry, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostBulk:
+
+    bulk_url = '/api/v1/posts/bulk/'
+    bulk_delete_url = '/api/v1/posts/bulk-delete/'
+
+    def test_bulk_create_json(self, user_client, client, user, group_1):
+        assert client.get('/api/v1/posts/').json() == []
+        items = [
+            {'text': f'Пост {i}', 'group': group_1.id} for i in range(5)
+        ]
+        response = user_client.post(self.bulk_url, data=items, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST-запрос к `{self.bulk_url}` со списком '
+            'постов возвращает ответ со статусом 201.'
+        )
+        data = response.json()
+        assert [item['text'] for item in data] == [
+            item['text'] for item in items
+        ]
+        assert all(item['author'] == user.username for item in data)
+        ids = [item['id'] for item in data]
+        assert sorted(Post.objects.filter(author=user).values_list(
+            'id', flat=True
+        )) == ids, (
+            'Проверьте, что в ответе указаны id созданных постов.'
+        )
+        assert {item['id']: item['text'] for item in data} == dict(
+            Post.objects.filter(id__in=ids).values_list('id', 'text')
+        ), (
+            'Проверьте, что каждому посту в ответе соответствует его id.'
+        )
+        assert UserStats.objects.get(user=user).posts_count == 5, (
+            'Проверьте, что массовое создание обновляет счётчик постов '
+            'автора.'
+        )
+        assert len(client.get('/api/v1/posts/').json()) == 5, (
+            'Проверьте, что массовое создание сбрасывает кэш списка постов.'
+        )
+
+    def test_bulk_create_ndjson(self, user_client):
+        body = '\n'.join(
+            json.dumps({'text': f'Пост {i}'}) for i in range(3)
+        ) + '\n'
+        response = user_client.post(
+            self.bulk_url, data=body, content_type='application/x-ndjson'
+        )
+        assert response.status_code == 201, (
+            f'Проверьте, что POST-запрос к `{self.bulk_url}` принимает '
+            'NDJSON.'
+        )
+        assert Post.objects.count() == 3
+
+        response = user_client.post(
+            self.bulk_url, data='{"text": "1"}\n{"text": ',
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == 400
+        assert 'line 2' in response.json()['detail']
+
+    def test_bulk_create_errors(self, user_client):
+        items = [{'text': 'Пост'}, {}, {'text': 'Пост', 'group': 999}]
+        response = user_client.post(self.bulk_url, data=items, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            'Проверьте, что ошибки массового создания возвращаются '
+            'по позициям элементов.'
+        )
+        assert 'text' in errors[1] and 'group' in errors[2]
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке в любом элементе посты не создаются.'
+        )
+
+        response = user_client.post(
+            self.bulk_url, data={'text': 'Пост'}, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_bulk_create_limit(self, user_client, settings):
+        settings.API_BULK_MAX_ITEMS = 2
+        response = user_client.post(
+            self.bulk_url, data=[{'text': 'Пост'}] * 3, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_bulk_create_unauthorized(self, client):
+        response = client.post(
+            self.bulk_url, data='[{"text": "Пост"}]',
+            content_type='application/json'
+        )
+        assert response.status_code == 401
+
+    def test_bulk_create_timeline(self, user_client, user, another_user,
+                                  settings):
+        settings.FEED_BACKEND = 'timeline'
+        Follow.objects.create(user=another_user, following=user)
+        response = user_client.post(
+            self.bulk_url, data=[{'text': '1'}, {'text': '2'}],
+            format='json'
+        )
+        assert TimelineEntry.objects.filter(
+            user=another_user
+        ).count() == 2, (
+            'Проверьте, что посты, созданные массово, попадают в ленты '
+            'подписчиков.'
+        )
+        assert response.status_code == 201
+
+    def test_bulk_delete(self, user_client, post, post_2, another_post):
+        ids = [post.id, another_post.id, 999999]
+        response = user_client.post(
+            self.bulk_delete_url, data={'ids': ids}, format='json'
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            'deleted': [post.id],
+            'not_found': [999999],
+            'forbidden': [another_post.id],
+        }, (
+            f'Проверьте, что POST-запрос к `{self.bulk_delete_url}` удаляет '
+            'только свои посты и сообщает о ненайденных и чужих.'
+        )
+        assert set(Post.objects.values_list('id', flat=True)) == {
+            post_2.id, another_post.id
+        }
+
+        response = user_client.post(
+            self.bulk_delete_url, data={'ids': []}, format='json'
+        )
+        assert response.status_code == 400
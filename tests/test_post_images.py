@@ -0,0 +1,116 @@
+from io import BytesIO, StringIO
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+import pytest
+
+from posts.models import Post
+
+
+def make_image(size=(1600, 1200), image_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 50, 50)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostImages:
+
+    post_list_url = '/api/v1/posts/'
+
+    def create_post(self, user_client, content, name='image.png'):
+        return user_client.post(self.post_list_url, data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content),
+        }, format='multipart')
+
+    def test_thumbnails(self, user_client, client, settings, media_root):
+        settings.POST_IMAGE_WORKERS = 0
+        response = self.create_post(user_client, make_image())
+        assert response.status_code == 201
+        data = response.json()
+        assert data['image_status'] == Post.IMAGE_PENDING, (
+            'Проверьте, что пост с изображением создаётся сразу, '
+            'со статусом обработки `pending`.'
+        )
+
+        data = client.get(f'{self.post_list_url}{data["id"]}/').json()
+        assert data['image_status'] == Post.IMAGE_READY
+        assert set(data['thumbnails']) == set(settings.POST_IMAGE_SIZES), (
+            'Проверьте, что после обработки в ответе есть миниатюры '
+            'всех размеров из `POST_IMAGE_SIZES`.'
+        )
+        assert data['thumbnails']['small'].startswith('http://testserver/')
+        post = Post.objects.get(id=data['id'])
+        with Image.open(media_root / post.thumbnails['small']) as thumbnail:
+            assert thumbnail.format == 'JPEG'
+            assert max(thumbnail.size) == 320
+
+        response = user_client.patch(
+            f'{self.post_list_url}{post.id}/', data={'image': None},
+            format='json'
+        )
+        assert response.json()['image_status'] == ''
+        assert response.json()['thumbnails'] == {}
+
+    def test_background_workers(self, user_client, client, settings,
+                                media_root):
+        settings.POST_IMAGE_WORKERS = 2
+        post_id = self.create_post(user_client, make_image()).json()['id']
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            post = Post.objects.get(id=post_id)
+            if post.image_status != Post.IMAGE_PENDING:
+                break
+            time.sleep(0.05)
+        assert post.image_status == Post.IMAGE_READY, (
+            'Проверьте, что изображения обрабатываются пулом потоков '
+            'после ответа на запрос.'
+        )
+
+    def test_invalid_image(self, user_client, settings, media_root):
+        settings.POST_IMAGE_WORKERS = 0
+        response = self.create_post(user_client, b'not an image')
+        assert response.status_code == 400, (
+            'Проверьте, что файл, который не является изображением, '
+            'отклоняется уже при загрузке.'
+        )
+
+        truncated = make_image()[:200]
+        response = self.create_post(user_client, truncated)
+        assert response.status_code == 201
+        post = Post.objects.get(id=response.json()['id'])
+        assert post.image_status == Post.IMAGE_FAILED, (
+            'Проверьте, что повреждённое изображение получает статус '
+            '`failed` при фоновой обработке.'
+        )
+
+    def test_process_pending_images(self, user_client, settings, media_root,
+                                    monkeypatch):
+        # очередь потеряна при перезапуске: задачи не выполняются
+        monkeypatch.setattr('posts.images.schedule', lambda post_id: None)
+        post_id = self.create_post(user_client, make_image()).json()['id']
+
+        call_command('process_pending_images', stdout=StringIO())
+        assert Post.objects.get(id=post_id).image_status == (
+            Post.IMAGE_PENDING
+        ), (
+            'Проверьте, что `process_pending_images` пропускает свежие '
+            'изображения, которые ещё могут быть в очереди.'
+        )
+
+        call_command('process_pending_images', min_age=0, stdout=StringIO())
+        post = Post.objects.get(id=post_id)
+        assert post.image_status == Post.IMAGE_READY, (
+            'Проверьте, что `process_pending_images` обрабатывает '
+            'изображения, оставшиеся в статусе `pending`.'
+        )
+        assert set(post.thumbnails) == set(settings.POST_IMAGE_SIZES)
@@ -0,0 +1,273 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Comment, Follow, Post
+
+
+def without_counters(queries):
+    """
+    Запросы без обслуживания денормализованных счётчиков
+    """
+    return [
+        query['sql'] for query in queries
+        if 'posts_userstats' not in query['sql']
+        and 'SET "comments_count"' not in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryCount:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    def test_post_list_constant_queries(self, client, user, another_user,
+                                        group_1):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', group=group_1,
+                 author=(user, another_user)[i % 2])
+            for i in range(20)
+        )
+        small_page = self.count_queries(
+            client, f'{self.post_list_url}?limit=2'
+        )
+        large_page = self.count_queries(
+            client, f'{self.post_list_url}?limit=20'
+        )
+        assert small_page == large_page, (
+            'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.post_list_url}` не зависит от размера страницы: '
+            'авторы постов должны загружаться одним запросом.'
+        )
+        # валидаторы условного GET и сам список
+        not_paginated = self.count_queries(client, self.post_list_url)
+        assert not_paginated == 2, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` без '
+            'пагинации выполняет один запрос к БД за списком.'
+        )
+
+    def test_post_detail_single_query(self, client, post):
+        assert self.count_queries(
+            client, self.post_detail_url.format(post_id=post.id)
+        ) == 1, (
+            f'Проверьте, что GET-запрос к `{self.post_detail_url}` '
+            'загружает пост вместе с автором одним запросом.'
+        )
+
+    def test_comment_list_constant_queries(self, client, post, user,
+                                           another_user):
+        comments_url = f'/api/v1/posts/{post.id}/comments/'
+        Comment.objects.bulk_create(
+            Comment(post=post, text=f'Коммент {i}',
+                    author=(user, another_user)[i % 2])
+            for i in range(20)
+        )
+        assert self.count_queries(client, comments_url) == 2, (
+            f'Проверьте, что GET-запрос к `{comments_url}` загружает '
+            'комментарии вместе с авторами одним запросом.'
+        )
+        assert self.count_queries(
+            client, f'{comments_url}?limit=2'
+        ) == self.count_queries(client, f'{comments_url}?limit=20'), (
+            'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{comments_url}` не зависит от размера страницы.'
+        )
+
+    def test_comment_list_paginated(self, client, post, user):
+        comments_url = f'/api/v1/posts/{post.id}/comments/'
+        Comment.objects.bulk_create(
+            Comment(post=post, author=user, text=f'Коммент {i}')
+            for i in range(5)
+        )
+        response = client.get(f'{comments_url}?limit=2&offset=2')
+        test_data = response.json()
+        assert test_data['count'] == 5 and len(test_data['results']) == 2, (
+            f'Проверьте, что GET-запрос к `{comments_url}` с параметрами '
+            '`limit` и `offset` возвращает страницу комментариев.'
+        )
+        assert test_data['results'][0]['text'] == 'Коммент 2', (
+            f'Проверьте, что комментарии в ответе на GET-запрос к '
+            f'`{comments_url}` упорядочены по дате добавления.'
+        )
+
+    def test_authenticated_user_cached(self, user_client, user):
+        url = '/api/v1/follow/'
+        cold = self.count_queries(user_client, url)
+        warm = self.count_queries(user_client, url)
+        assert warm == cold - 1, (
+            'Проверьте, что при повторном запросе с тем же JWT-токеном '
+            'пользователь берётся из кэша без запроса к `auth_user`.'
+        )
+
+        user.is_active = False
+        user.save()
+        response = user_client.get(url)
+        assert response.status_code == 401, (
+            'Проверьте, что деактивация пользователя сбрасывает кэш '
+            'аутентификации и его токен перестаёт приниматься.'
+        )
+
+    def test_metrics_report_hit_rate(self, user_client, user, client):
+        user_client.get('/api/v1/follow/')
+        user_client.get('/api/v1/follow/')
+        user.is_staff = True
+        user.save()
+        response = user_client.get('/api/v1/metrics/')
+        assert response.status_code == 200, (
+            'Проверьте, что администратору доступен `/api/v1/metrics/`.'
+        )
+        assert 'auth_user_cache' in response.json()['hit_rates'], (
+            'Проверьте, что `/api/v1/metrics/` сообщает долю попаданий '
+            'в кэш аутентификации.'
+        )
+        assert client.get('/api/v1/metrics/').status_code == 401
+
+    def test_comment_write_queries(self, user_client, post, comment_1_post):
+        comments_url = f'/api/v1/posts/{post.id}/comments/'
+        user_client.get(comments_url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(comments_url, data={'text': 'Новый'})
+        assert response.status_code == 201
+        assert len(without_counters(context.captured_queries)) == 2, (
+            f'Проверьте, что POST-запрос к `{comments_url}` проверяет '
+            'существование поста запросом EXISTS и не загружает пост '
+            'целиком.'
+        )
+        assert response.json()['post'] == post.id
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{comments_url}{comment_1_post.id}/', data={'text': 'Правка'}
+            )
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 2, (
+            f'Проверьте, что PATCH-запрос к `{comments_url}<id>/` не '
+            'запрашивает пост повторно.'
+        )
+
+        response = user_client.post(
+            '/api/v1/posts/0/comments/', data={'text': 'Новый'}
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий к несуществующему посту не '
+            'создаётся и возвращается ответ со статусом 404.'
+        )
+
+    def test_follow_create_queries(self, user_client, another_user):
+        url = '/api/v1/follow/'
+        user_client.get(url)
+        data = {'following': another_user.username}
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201
+        statements = [
+            sql for sql in without_counters(context.captured_queries)
+            if sql.split()[0] in ('SELECT', 'INSERT')
+        ]
+        assert len(statements) == 2, (
+            f'Проверьте, что POST-запрос к `{url}` выполняет только поиск '
+            'автора и вставку подписки.'
+        )
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Вы уже подписаны на этого пользователя']
+        }, (
+            f'Проверьте, что повторный POST-запрос к `{url}` возвращает '
+            'сообщение о существующей подписке.'
+        )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='План запроса проверяется для SQLite',
+)
+@pytest.mark.django_db(transaction=True)
+class TestQueryPlan:
+
+    def check_index(self, queryset, index_name):
+        plan = queryset.explain()
+        assert index_name in plan, (
+            f'Проверьте, что запрос `{queryset.query}` использует индекс '
+            f'`{index_name}`. План запроса:\n{plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что запрос `{queryset.query}` не сортирует '
+            f'результат во временной таблице. План запроса:\n{plan}'
+        )
+
+    def test_post_feed_uses_index(self, post):
+        self.check_index(Post.objects.all()[:10], 'post_pub_date_id_idx')
+
+    def test_comment_thread_uses_index(self, comment_1_post):
+        self.check_index(
+            Comment.objects.filter(post_id=comment_1_post.post_id),
+            'comment_post_created_idx',
+        )
+
+    def test_follow_lookup_uses_index(self, follow_1):
+        plan = Follow.objects.filter(
+            user_id=follow_1.user_id, following_id=follow_1.following_id
+        ).explain()
+        assert 'sqlite_autoindex_posts_follow' in plan, (
+            'Проверьте, что поиск подписки по `user` и `following` '
+            f'использует индекс ограничения `unique_follow`:\n{plan}'
+        )
+
+    def follow_search_queryset(self, user, term):
+        """
+        QuerySet FollowViewSet для `/api/v1/follow/?search=<term>`
+        """
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from api.filters import IndexedSearchFilter
+        from api.views import FollowViewSet
+
+        request = Request(
+            APIRequestFactory().get('/api/v1/follow/', {'search': term})
+        )
+        request.user = user
+        view = FollowViewSet(request=request, action='list', format_kwarg=None)
+        return IndexedSearchFilter().filter_queryset(
+            request, view.get_queryset(), view
+        )
+
+    def test_follow_search_uses_index(self, user, django_user_model):
+        plan = self.follow_search_queryset(user, 'test').explain()
+        assert 'SCAN' not in plan, (
+            'Проверьте, что поиск `/api/v1/follow/?search=` не '
+            f'просматривает таблицы целиком:\n{plan}'
+        )
+
+        # при большом числе подписок и собранной статистике планировщик
+        # ищет подписки по функциональному индексу имени
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'followed{i}') for i in range(500)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=user, following=following)
+            for following in django_user_model.objects.exclude(pk=user.pk)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        try:
+            plan = self.follow_search_queryset(user, 'followed12').explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM sqlite_stat1')
+                cursor.execute('ANALYZE sqlite_master')
+        assert 'user_username_lower_idx' in plan, (
+            'Проверьте, что регистронезависимый поиск подписок по '
+            f'`username` использует функциональный индекс:\n{plan}'
+        )
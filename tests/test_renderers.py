@@ -0,0 +1,93 @@
+import datetime
+from decimal import Decimal
+from io import BytesIO
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from posts.models import Post
+
+
+class TestFastJSON:
+    data = {
+        'id': 1,
+        'text': 'Пост с разделителем',
+        'pub_date': datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        'date': datetime.date(2024, 1, 2),
+        'lazy': gettext_lazy('Нет доступа'),
+        'decimal': Decimal('1.5'),
+        'nested': [{'a': None, 'b': True}],
+        1: 'ключ-число',
+    }
+
+    def test_same_output_as_json_renderer(self):
+        expected = JSONRenderer().render(self.data)
+        assert renderers.FastJSONRenderer().render(self.data) == expected, (
+            'Проверьте, что FastJSONRenderer выдаёт те же байты, '
+            'что и JSONRenderer.'
+        )
+        with timezone.override('Europe/Moscow'):
+            data = {'pub_date': timezone.localtime(self.data['pub_date'])}
+            assert renderers.FastJSONRenderer().render(data) == (
+                JSONRenderer().render(data)
+            )
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(self.data) == (
+            JSONRenderer().render(self.data)
+        ), 'Проверьте, что без orjson используется стандартный json.'
+
+    def test_indent_uses_json(self):
+        rendered = renderers.FastJSONRenderer().render(
+            {'id': 1}, 'application/json; indent=4'
+        )
+        assert rendered == b'{\n    "id": 1\n}'
+
+    def test_file_url(self):
+        post = Post(image='posts/image.jpg')
+        rendered = renderers.FastJSONRenderer().render({'image': post.image})
+        assert rendered == f'{{"image":"{post.image.url}"}}'.encode(), (
+            'Проверьте, что FastJSONRenderer отдаёт URL файла ImageField.'
+        )
+        assert renderers.FastJSONRenderer().render(
+            {'image': Post().image}
+        ) == b'{"image":null}'
+
+    def test_parser(self, monkeypatch):
+        body = '{"text": "Пост", "group": null}'.encode()
+        parser = parsers.FastJSONParser()
+        assert parser.parse(BytesIO(body)) == {'text': 'Пост', 'group': None}
+        with pytest.raises(ParseError):
+            parser.parse(BytesIO(b'{"text": '))
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert parser.parse(BytesIO(body)) == {'text': 'Пост', 'group': None}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFastJSONAPI:
+
+    def test_invalid_json(self, user_client):
+        response = user_client.post(
+            '/api/v1/posts/', data='{"text": ',
+            content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что на POST-запрос с некорректным JSON '
+            'возвращается статус 400.'
+        )
+        assert 'JSON parse error' in response.json()['detail']
+
+    def test_json_body(self, user_client):
+        response = user_client.post(
+            '/api/v1/posts/', data='{"text": "Пост из JSON"}',
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Пост из JSON'
@@ -0,0 +1,126 @@
+from django.core.files.base import ContentFile
+import pytest
+
+from posts.models import Post
+from posts.storage import ContentAddressedStorage, ObjectStorage
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+class TestContentAddressedStorage:
+
+    def test_dedup(self, media_root):
+        storage = ContentAddressedStorage()
+        first = storage.save('posts/a.PNG', ContentFile(b'image'))
+        second = storage.save('posts/b.png', ContentFile(b'image'))
+        other = storage.save('posts/c.png', ContentFile(b'other'))
+        assert first == second != other, (
+            'Проверьте, что одинаковое содержимое сохраняется под одним '
+            'именем, а разное - под разными.'
+        )
+        directory, shard_1, shard_2, name = first.split('/')
+        assert directory == 'posts' and name.endswith('.png')
+        assert name.startswith(shard_1 + shard_2)
+        assert len(list(media_root.rglob('*.png'))) == 2
+
+        storage.delete(first)
+        assert storage.exists(first), (
+            'Проверьте, что общий файл не удаляется вместе с одной '
+            'из ссылающихся на него записей.'
+        )
+
+
+class TestObjectStorage:
+
+    def test_objects(self, tmp_path):
+        storage = ObjectStorage({'BUCKET': 'test', 'ROOT': tmp_path})
+        name = storage.save('posts/image.png', ContentFile(b'content'))
+        assert storage.exists(name) and storage.size(name) == 7
+        with storage.open(name) as file:
+            assert file.read() == b'content'
+        assert storage.url(name) == f'/media/{name}'
+        assert storage.client.head_object(
+            Bucket='test', Key=name
+        )['ContentType'] == 'image/png'
+
+        assert storage.save('posts/image.png', ContentFile(b'x')) != name
+        storage.delete(name)
+        assert not storage.exists(name)
+        with pytest.raises(FileNotFoundError):
+            storage.open(name)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestServeMedia:
+
+    content = bytes(range(256)) * 40
+
+    @pytest.fixture
+    def image_url(self, media_root, post):
+        post.image.save('image.png', ContentFile(self.content))
+        return Post.objects.get(id=post.id).image.url
+
+    def test_full_file(self, client, image_url):
+        response = client.get(image_url)
+        assert response.status_code == 200, (
+            'Проверьте, что изображения постов отдаются по `MEDIA_URL`.'
+        )
+        assert response.streaming
+        assert b''.join(response.streaming_content) == self.content
+        assert response['Content-Length'] == str(len(self.content))
+        assert response['Accept-Ranges'] == 'bytes'
+        assert 'immutable' in response['Cache-Control']
+
+    def test_range(self, client, image_url):
+        size = len(self.content)
+        response = client.get(image_url, HTTP_RANGE='bytes=10-19')
+        assert response.status_code == 206, (
+            'Проверьте, что запрос с заголовком `Range` получает '
+            'ответ со статусом 206.'
+        )
+        assert b''.join(response.streaming_content) == self.content[10:20]
+        assert response['Content-Range'] == f'bytes 10-19/{size}'
+
+        response = client.get(image_url, HTTP_RANGE='bytes=-5')
+        assert b''.join(response.streaming_content) == self.content[-5:]
+        response = client.get(image_url, HTTP_RANGE='bytes=100-')
+        assert b''.join(response.streaming_content) == self.content[100:]
+
+        response = client.get(image_url, HTTP_RANGE=f'bytes={size}-')
+        assert response.status_code == 416
+        assert response['Content-Range'] == f'bytes */{size}'
+
+    def test_missing(self, client, media_root):
+        assert client.get('/media/posts/missing.png').status_code == 404
+        assert client.get('/media/../settings.py').status_code == 404
+
+    def test_accel_redirect(self, client, image_url, settings):
+        settings.MEDIA_SERVE_MODE = 'x-accel-redirect'
+        response = client.get(image_url)
+        assert response['X-Accel-Redirect'] == (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX
+            + image_url[len(settings.MEDIA_URL):]
+        ), (
+            'Проверьте, что при `MEDIA_SERVE_MODE = "x-accel-redirect"` '
+            'файл отдаёт веб-сервер.'
+        )
+        assert response.content == b''
+
+    def test_sendfile_without_local_path(self, client, settings, tmp_path,
+                                         monkeypatch):
+        storage = ObjectStorage({'BUCKET': 'test', 'ROOT': tmp_path})
+        storage.save('posts/image.png', ContentFile(self.content))
+        monkeypatch.setattr(
+            'posts.views.get_image_storage', lambda: storage
+        )
+        settings.MEDIA_SERVE_MODE = 'x-sendfile'
+        response = client.get(f'{settings.MEDIA_URL}posts/image.png')
+        assert response.status_code == 200, (
+            'Проверьте, что при `MEDIA_SERVE_MODE = "x-sendfile"` файл '
+            'хранилища без локальных путей отдаётся частями.'
+        )
+        assert b''.join(response.streaming_content) == self.content
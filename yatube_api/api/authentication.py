@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import metrics
+from .cache import get_cache
+
+
+def user_cache_key(user_id):
+    return f'api:auth-user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая берёт пользователя из кэша
+    на API_USER_CACHE_TIMEOUT секунд вместо запроса к auth_user.
+    Запись сбрасывается при сохранении и удалении пользователя
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is not None:
+            metrics.incr('auth_user_cache.hit')
+            return user
+
+        metrics.incr('auth_user_cache.miss')
+        user = super().get_user(validated_token)
+        cache.set(key, user, settings.API_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+
+
+# бэкенды с отдельной копией кэша в каждом процессе
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def responses_cacheable():
+    """
+    Кэш ответов включён только на общем для процессов бэкенде: в кэше
+    процесса ответ устаревает после записи в другом процессе, а версии
+    и блокировки cache.add() не видны другим процессам.
+    API_CACHE_ALLOW_LOCAL разрешает его при единственном процессе
+    """
+    backend = settings.CACHES[settings.API_CACHE_ALIAS]['BACKEND']
+    return backend not in LOCAL_BACKENDS or settings.API_CACHE_ALLOW_LOCAL
+
+
+def version_key(namespace):
+    return f'api:{namespace}:version'
+
+
+def comments_namespace(post_id):
+    return f'comments:{post_id}'
+
+
+def post_namespace(post_id):
+    return f'post:{post_id}'
+
+
+def get_version(namespace):
+    """
+    Версия пространства ключей: время последнего изменения в нс.
+    Если версия вытеснена из кэша, начинается новая
+    """
+    cache = get_cache()
+    key = version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Инвалидация всех ключей пространства сменой его версии
+    """
+    get_cache().set(version_key(namespace), time.time_ns(), None)
+
+
+def make_key(namespace, *parts):
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'api:{namespace}:{get_version(namespace)}:{digest}'
+
+
+def make_etag(data):
+    return quote_etag(hashlib.md5(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    Проверка If-None-Match, а если его нет - If-Modified-Since
+    (last_modified - timestamp)
+    """
+    if request.headers.get('If-None-Match'):
+        return etag_matches(request, etag)
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+    return (
+        since is not None
+        and last_modified is not None
+        and int(last_modified) <= since
+    )
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def should_refresh_early(delta, expires, beta=None):
+    """
+    Вероятностное досрочное обновление (XFetch): чем ближе истечение
+    ключа и чем дольше его вычисление (delta), тем вероятнее, что
+    запрос пересчитает значение заранее, пока остальные читают старое
+    """
+    if beta is None:
+        beta = settings.API_CACHE_EARLY_REFRESH_BETA
+    return time.time() - delta * beta * math.log(
+        1 - random.random()
+    ) >= expires
+
+
+def _compute_and_set(key, compute, timeout):
+    start = time.monotonic()
+    value = compute()
+    if value is not None:
+        delta = time.monotonic() - start
+        get_cache().set(
+            key, (value, delta, time.time() + timeout), timeout
+        )
+    return value
+
+
+def _wait_for(key, lock):
+    """
+    Значение, записанное держателем блокировки. Если блокировка снята,
+    а значения нет (ответ не кэшируется: 404, 400, исключение), ждать
+    больше нечего
+    """
+    cache = get_cache()
+    deadline = time.monotonic() + settings.API_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.API_CACHE_LOCK_POLL_INTERVAL)
+        released = cache.get(lock) is None
+        stored = cache.get(key)
+        if stored is not None:
+            return stored[0]
+        if released:
+            break
+    return None
+
+
+def _fill(key, compute, timeout):
+    """
+    Заполнение ключа одним процессом: блокировка cache.add(),
+    остальные ждут значение не дольше API_CACHE_LOCK_TIMEOUT
+    """
+    cache = get_cache()
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, settings.API_CACHE_LOCK_TIMEOUT):
+        try:
+            return _compute_and_set(key, compute, timeout)
+        finally:
+            cache.delete(lock)
+    metrics.incr('api_cache.wait')
+    value = _wait_for(key, lock)
+    if value is None:
+        value = _compute_and_set(key, compute, timeout)
+    return value
+
+
+def _single_flight(key, compute, timeout):
+    """
+    Одновременные промахи по ключу в процессе ждут первый запрос
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        metrics.incr('api_cache.coalesced')
+        flight.done.wait(settings.API_CACHE_LOCK_TIMEOUT)
+        if flight.value is not None:
+            return flight.value
+        return _compute_and_set(key, compute, timeout)
+    try:
+        flight.value = _fill(key, compute, timeout)
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.value
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Значение ключа из кэша или compute() с защитой от лавины промахов:
+    значение вычисляет один запрос (в процессе и между процессами),
+    горячие ключи пересчитываются досрочно. Если compute() вернул None,
+    значение не кэшируется
+    """
+    if timeout is None:
+        timeout = settings.API_CACHE_TIMEOUT
+    cache = get_cache()
+    stored = cache.get(key)
+    if stored is None:
+        metrics.incr('api_cache.miss')
+        return _single_flight(key, compute, timeout)
+
+    value, delta, expires = stored
+    metrics.incr('api_cache.hit')
+    if should_refresh_early(delta, expires):
+        lock = f'{key}:lock'
+        if cache.add(lock, 1, settings.API_CACHE_LOCK_TIMEOUT):
+            metrics.incr('api_cache.early_refresh')
+            try:
+                return _compute_and_set(key, compute, timeout) or value
+            finally:
+                cache.delete(lock)
+    return value
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов list/retrieve с поддержкой ETag.
+
+    В кэше хранятся данные сериализатора и их ETag (или ETag и
+    Last-Modified, выставленные обработчиком); ключи живут
+    в пространстве get_cache_namespace(), которое инвалидируется через
+    bump_version(), и учитывают версии get_cache_dependencies().
+    Заполнение и обновление ключей - через get_or_compute().
+    Без общего кэша (responses_cacheable()) ответы не кэшируются
+    """
+    cache_namespace = None
+    cache_dependencies = ()
+    cache_actions = ('list', 'retrieve')
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def get_cache_namespace(self):
+        return self.cache_namespace
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    def get_cache_key(self, request):
+        return make_key(
+            self.get_cache_namespace(),
+            request.build_absolute_uri(),
+            *(
+                get_version(namespace)
+                for namespace in self.get_cache_dependencies()
+            )
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        responses = []
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            responses.append(response)
+            if response.status_code != status.HTTP_200_OK:
+                return None
+            headers = {
+                name: response[name]
+                for name in self.cached_headers if response.has_header(name)
+            }
+            headers.setdefault('ETag', make_etag(response.data))
+            return response.data, headers
+
+        entry = get_or_compute(self.get_cache_key(request), compute)
+        if entry is None:
+            return responses[-1]
+
+        data, headers = entry
+        last_modified = parse_http_date_safe(headers.get('Last-Modified'))
+        if is_not_modified(request, headers['ETag'], last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def is_cached(self, action):
+        return action in self.cache_actions and responses_cacheable()
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_cached('list'):
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_cached('retrieve'):
+            return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,63 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import is_not_modified
+
+
+class ConditionalListMixin:
+    """
+    Условный GET для list(): ETag и Last-Modified без сериализации.
+
+    Валидаторы считаются одним агрегатным запросом по отфильтрованному
+    QuerySet: MAX(conditional_date_field), MAX(updated), MAX(pk) и
+    COUNT(*). Они берутся из БД, а не из кэша процесса, поэтому
+    запись в другом процессе тоже их меняет: новая строка сдвигает
+    MAX(pk), удалённая - COUNT(*), правка - MAX(updated)
+    """
+    conditional_date_field = None
+    conditional_updated_field = 'updated'
+
+    def get_validators(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(
+            last=Max(self.conditional_date_field),
+            updated=Max(self.conditional_updated_field),
+            last_id=Max('pk'),
+            count=Count('pk'),
+        )
+        etag = quote_etag(hashlib.md5('|'.join(str(part) for part in (
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+            stats['last'] and stats['last'].isoformat(),
+            stats['updated'] and stats['updated'].isoformat(),
+            stats['last_id'],
+            stats['count'],
+        )).encode()).hexdigest())
+
+        last_modified = max(
+            (
+                moment.timestamp()
+                for moment in (stats['last'], stats['updated'])
+                if moment is not None
+            ),
+            default=None,
+        )
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,159 @@
+"""
+Быстрая сериализация для списков только на чтение.
+
+Строки берутся из QuerySet.values() (username автора — через JOIN),
+словари ответа собираются напрямую, без экземпляров моделей и
+to_representation() полей DRF. Вывод совпадает с обычными
+сериализаторами байт в байт; набор и порядок полей берутся из их Meta,
+поэтому новые поля нужно добавлять и сюда (sources/converters),
+иначе отдаётся значение колонки как есть
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .serializers import (
+    CommentSerializer,
+    FollowSerializer,
+    GroupSerializer,
+    PostSerializer,
+    build_file_url,
+)
+from .sparse import is_sparse_request, select_fields
+
+
+def datetime_to_representation(value):
+    """
+    То же, что DateTimeField.to_representation() в формате ISO 8601
+    """
+    if not value:
+        return None
+    if settings.USE_TZ:
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class FastSerializer:
+    """
+    Сериализатор строк .values() для модели serializer_class.
+
+    sources - путь в .values() для поля ответа (по умолчанию имя поля),
+    converters - имя метода, преобразующего значение колонки
+    """
+    serializer_class = None
+    sources = {}
+    converters = {}
+
+    def __init__(self, request=None):
+        self.request = request
+        fields = self.serializer_class.Meta.fields
+        if is_sparse_request(request):
+            fields = select_fields(request, fields)
+        self.fields = [
+            (
+                name,
+                self.sources.get(name, name),
+                getattr(self, self.converters[name], None)
+                if name in self.converters else None,
+            )
+            for name in fields
+        ]
+
+    def values(self, queryset, *extra):
+        """
+        QuerySet строк с колонками полей ответа и колонками extra
+        (например, ключом пагинации)
+        """
+        paths = dict.fromkeys(
+            [source for _, source, _ in self.fields] + list(extra)
+        )
+        return queryset.values(*paths)
+
+    def to_representation(self, row):
+        data = {}
+        for name, source, convert in self.fields:
+            value = row[source]
+            data[name] = value if convert is None else convert(value)
+        return data
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def datetime(self, value):
+        return datetime_to_representation(value)
+
+
+class FastPostSerializer(FastSerializer):
+    serializer_class = PostSerializer
+    sources = {'author': 'author__username', 'group': 'group_id'}
+    converters = {
+        'pub_date': 'datetime', 'image': 'image', 'thumbnails': 'thumbnails',
+    }
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.storage = self.serializer_class.Meta.model._meta.get_field(
+            'image'
+        ).storage
+
+    def image(self, name):
+        # то же, что FileField.to_representation() с use_url
+        if not name:
+            return None
+        return build_file_url(self.storage, name, self.request)
+
+    def thumbnails(self, value):
+        return {
+            size: build_file_url(self.storage, name, self.request)
+            for size, name in value.items()
+        }
+
+
+class FastCommentSerializer(FastSerializer):
+    serializer_class = CommentSerializer
+    sources = {'author': 'author__username', 'post': 'post_id'}
+    converters = {'created': 'datetime'}
+
+
+class FastGroupSerializer(FastSerializer):
+    serializer_class = GroupSerializer
+
+
+class FastFollowSerializer(FastSerializer):
+    serializer_class = FollowSerializer
+    sources = {'user': 'user__username', 'following': 'following__username'}
+
+
+class FastListMixin:
+    """
+    list() через fast_serializer_class при API_FAST_SERIALIZERS.
+    Пагинатор получает QuerySet словарей; вместе с полями ответа
+    выбираются pk и sparse_required_fields (ключ пагинации)
+    """
+    fast_serializer_class = None
+
+    def get_fast_extra_fields(self):
+        extra = ['pk', *getattr(self, 'sparse_required_fields', ())]
+        keyset_date_field = getattr(self, 'keyset_date_field', None)
+        if keyset_date_field is not None:
+            extra.append(keyset_date_field)
+        return extra
+
+    def list(self, request, *args, **kwargs):
+        if (
+            self.fast_serializer_class is None
+            or not settings.API_FAST_SERIALIZERS
+        ):
+            return super().list(request, *args, **kwargs)
+        serializer = self.fast_serializer_class(request)
+        queryset = serializer.values(
+            self.filter_queryset(self.get_queryset()),
+            *self.get_fast_extra_fields()
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
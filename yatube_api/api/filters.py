@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Lower
+from rest_framework import filters
+
+# верхняя граница диапазона для поиска по префиксу
+MAX_CHAR = '\U0010ffff'
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    Поиск, который может использовать индекс по полю.
+
+    Режимы (`?search_mode=`, по умолчанию API_SEARCH_MODE):
+    exact - точное совпадение, prefix - совпадение начала строки
+    (в SQLite - диапазон `>= term AND < term + MAX_CHAR` вместо
+    `LIKE 'term%'`; в PostgreSQL диапазон верен только при сортировке C,
+    поэтому там `LIKE 'term%'` по индексу с text_pattern_ops),
+    contains - стандартный `icontains` SearchFilter, индекс не используется.
+    При API_SEARCH_CASE_INSENSITIVE сравниваются значения LOWER(),
+    для них нужен функциональный индекс
+    """
+    search_mode_param = 'search_mode'
+    search_modes = ('exact', 'prefix', 'contains')
+
+    def get_search_mode(self, request):
+        mode = request.query_params.get(self.search_mode_param)
+        if mode in self.search_modes:
+            return mode
+        return settings.API_SEARCH_MODE
+
+    def get_term_condition(self, field, term, mode):
+        if mode == 'prefix' and connection.vendor == 'postgresql':
+            if settings.API_SEARCH_CASE_INSENSITIVE:
+                term = term.lower()
+            return Q(**{f'{field}__startswith': term})
+        if settings.API_SEARCH_CASE_INSENSITIVE:
+            value = Lower(Value(term))
+        else:
+            value = Value(term)
+        if mode == 'exact':
+            return Q(**{field: value})
+        return Q(**{
+            f'{field}__gte': value,
+            f'{field}__lt': Concat(value, Value(MAX_CHAR)),
+        })
+
+    def filter_queryset(self, request, queryset, view):
+        mode = self.get_search_mode(request)
+        if mode == 'contains':
+            return super().filter_queryset(request, queryset, view)
+
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        fields = []
+        for index, search_field in enumerate(search_fields):
+            if settings.API_SEARCH_CASE_INSENSITIVE:
+                alias = f'_search_{index}'
+                queryset = queryset.alias(**{alias: Lower(search_field)})
+                fields.append(alias)
+            else:
+                fields.append(search_field)
+
+        for term in search_terms:
+            condition = Q()
+            for field in fields:
+                condition |= self.get_term_condition(field, term, mode)
+            queryset = queryset.filter(condition)
+        return queryset
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты и комментарии в NDJSON потоком, не загружая '
+        'всю выборку в память'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models', default=','.join(export.EXPORTS),
+            help='Через запятую: %s' % ', '.join(export.EXPORTS),
+        )
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--since', help='Не раньше даты (ISO 8601)')
+        parser.add_argument('--until', help='Не позже даты (ISO 8601)')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, models, author, group, since, until, output,
+               chunk_size, **options):
+        names = [name.strip() for name in models.split(',') if name.strip()]
+        unknown = set(names) - set(export.EXPORTS)
+        if unknown:
+            raise CommandError(
+                'Неизвестные выгрузки: %s' % ', '.join(sorted(unknown))
+            )
+        try:
+            filters = export.parse_filters(author, group, since, until)
+        except ValueError as exc:
+            raise CommandError(exc)
+        chunks = export.export_lines(names, filters, chunk_size=chunk_size)
+        if output:
+            with open(output, 'wb') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            return
+        stream = getattr(self.stdout._out, 'buffer', None)
+        for chunk in chunks:
+            if stream is None:
+                self.stdout.write(chunk.decode(), ending='')
+            else:
+                stream.write(chunk)
+        if stream is not None:
+            stream.flush()
@@ -0,0 +1,214 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from api import importer
+from posts.models import Post
+
+User = get_user_model()
+
+WORDS = (
+    'пост', 'новость', 'сегодня', 'город', 'погода', 'книга', 'фильм',
+    'музыка', 'проект', 'код', 'python', 'django', 'api', 'запрос',
+    'ответ', 'лента', 'группа', 'подписка', 'комментарий', 'вечер',
+)
+
+
+def zipf_cum_weights(count, exponent):
+    """
+    Накопленные веса закона Ципфа: k-й элемент выбирается
+    с вероятностью, пропорциональной 1 / k ** exponent
+    """
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, группы, посты, комментарии и подписки '
+        'для локальных нагрузочных тестов; комментарии по постам и '
+        'подписчики по авторам распределены по закону Ципфа'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts-per-user', type=int, default=20)
+        parser.add_argument(
+            '--comments', type=int, default=None,
+            help='Всего комментариев; по умолчанию 2 на пост',
+        )
+        parser.add_argument(
+            '--follows', type=int, default=None,
+            help='Всего подписок; по умолчанию 10 на пользователя',
+        )
+        parser.add_argument(
+            '--comment-skew', type=float, default=1.1,
+            help='Показатель степени для комментариев по постам',
+        )
+        parser.add_argument(
+            '--follow-skew', type=float, default=1.1,
+            help='Показатель степени для подписчиков по авторам',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Посты и комментарии за последние N дней',
+        )
+        parser.add_argument(
+            '--prefix', default='user',
+            help='Имена пользователей: <prefix>0, <prefix>1, ...',
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help='Общий пароль пользователей для получения JWT',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя')
+        started = time.perf_counter()
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.days = options['days']
+        usernames = self.create_users(
+            options['prefix'], options['users'], options['password']
+        )
+        posts_count = options['users'] * options['posts_per_user']
+        comments_count = options['comments']
+        if comments_count is None:
+            comments_count = 2 * posts_count
+        follows_count = options['follows']
+        if follows_count is None:
+            follows_count = 10 * options['users']
+
+        first_post_id = (
+            Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        ) + 1
+        slugs = [
+            f'group-{self.random.getrandbits(32):x}-{i}'
+            for i in range(options['groups'])
+        ]
+        rows = itertools.chain(
+            self.groups(slugs),
+            self.posts(
+                usernames, options['posts_per_user'], first_post_id, slugs
+            ),
+            self.comments(
+                usernames, range(first_post_id, first_post_id + posts_count),
+                comments_count, options['comment_skew'],
+            ),
+            self.follows(usernames, follows_count, options['follow_skew']),
+        )
+        counts = importer.Importer(batch_size=options['batch_size']).run(
+            [('generate', ((0, row_type, row) for row_type, row in rows))]
+        )
+        importer.after_import(self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            'Создано: пользователей %d, %s за %.1f с' % (
+                len(usernames),
+                ', '.join(f'{name}: {count}'
+                          for name, count in counts.items()),
+                time.perf_counter() - started,
+            )
+        ))
+
+    def create_users(self, prefix, count, password):
+        usernames = [f'{prefix}{i}' for i in range(count)]
+        # один хеш на всех: make_password на каждого занял бы минуты
+        password = make_password(password)
+        User.objects.bulk_create(
+            (User(username=name, password=password) for name in usernames),
+            batch_size=500, ignore_conflicts=True,
+        )
+        return usernames
+
+    def moment(self):
+        return (
+            self.now - timedelta(seconds=self.random.uniform(
+                0, self.days * 24 * 3600
+            ))
+        ).isoformat()
+
+    def text(self, low, high):
+        return ' '.join(
+            self.random.choices(WORDS, k=self.random.randint(low, high))
+        ).capitalize()
+
+    def groups(self, slugs):
+        for i, slug in enumerate(slugs):
+            yield 'group', {
+                'title': f'Группа {i}',
+                'slug': slug,
+                'description': self.text(5, 20),
+            }
+
+    def posts(self, usernames, per_user, first_id, slugs):
+        post_id = first_id
+        for username in usernames:
+            for _ in range(per_user):
+                yield 'post', {
+                    'id': post_id,
+                    'text': self.text(10, 60),
+                    'author': username,
+                    'pub_date': self.moment(),
+                    'group': (
+                        self.random.choice(slugs)
+                        if slugs and self.random.random() < 0.5 else None
+                    ),
+                }
+                post_id += 1
+
+    def comments(self, usernames, post_ids, count, skew):
+        if not post_ids or not count:
+            return
+        # популярные посты разбросаны по авторам и датам
+        post_ids = list(post_ids)
+        self.random.shuffle(post_ids)
+        targets = self.random.choices(
+            post_ids, cum_weights=zipf_cum_weights(len(post_ids), skew),
+            k=count,
+        )
+        authors = self.random.choices(usernames, k=count)
+        for post_id, author in zip(targets, authors):
+            yield 'comment', {
+                'text': self.text(3, 30),
+                'author': author,
+                'post': post_id,
+                'created': self.moment(),
+            }
+
+    def follows(self, usernames, count, skew):
+        popular = list(usernames)
+        self.random.shuffle(popular)
+        cum_weights = zipf_cum_weights(len(popular), skew)
+        pairs = set()
+        # не больше возможных пар; повторы и подписки на себя отбрасываются
+        limit = min(count, len(usernames) * (len(usernames) - 1))
+        while len(pairs) < limit:
+            found = len(pairs)
+            # с запасом: часть пар окажется повторами
+            draws = max(limit - len(pairs), 1000)
+            followings = self.random.choices(
+                popular, cum_weights=cum_weights, k=draws
+            )
+            for user, following in zip(
+                self.random.choices(usernames, k=draws), followings
+            ):
+                if user != following and (user, following) not in pairs:
+                    pairs.add((user, following))
+                    yield 'follow', {'user': user, 'following': following}
+                    if len(pairs) >= limit:
+                        return
+            if len(pairs) == found:
+                # при сильном перекосе новые пары почти не выпадают
+                break
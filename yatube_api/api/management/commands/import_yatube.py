@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from api import importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты, комментарии и подписки из NDJSON '
+        '(поле type в каждой строке) и CSV пачками в одной '
+        'транзакции, затем пересчитывает счётчики'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', metavar='path',
+            help='Файлы .ndjson/.jsonl/.csv; - читает NDJSON из stdin',
+        )
+        parser.add_argument(
+            '--type', dest='row_type',
+            help='Тип всех строк: group, post, comment или follow',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создавать отсутствующих авторов без пароля',
+        )
+        parser.add_argument(
+            '--progress-every', type=int, default=100000,
+            help='Сообщать о ходе загрузки каждые N строк',
+        )
+        parser.add_argument(
+            '--skip-reconcile', action='store_true',
+            help='Не пересчитывать счётчики и ленты после загрузки',
+        )
+
+    def handle(self, *args, paths, row_type, batch_size, create_users,
+               progress_every, skip_reconcile, **options):
+        started = time.perf_counter()
+        reported = 0
+
+        def progress(counts):
+            nonlocal reported
+            total = sum(counts.values())
+            if total - reported < progress_every:
+                return
+            reported = total
+            self.stdout.write(
+                f'Загружено строк: {total} '
+                f'({self.rate(total, started):.0f} строк/с)'
+            )
+
+        try:
+            if row_type is not None:
+                row_type = importer.get_type(row_type)
+            counts = importer.import_files(
+                paths, row_type, batch_size=batch_size,
+                create_users=create_users, progress=progress,
+            )
+        except (importer.ImportRowError, OSError, DatabaseError) as exc:
+            raise CommandError(f'Загрузка отменена: {exc}')
+
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            'Загружено: %s; всего %d строк за %.1f с (%.0f строк/с)' % (
+                ', '.join(f'{name}: {count}'
+                          for name, count in counts.items()),
+                total, time.perf_counter() - started,
+                self.rate(total, started),
+            )
+        ))
+        importer.after_import(self.stdout, reconcile=not skip_reconcile)
+
+    @staticmethod
+    def rate(count, started):
+        elapsed = time.perf_counter() - started
+        return count / elapsed if elapsed else 0.0
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие OutstandingToken (и их BlacklistedToken) '
+        'пачками, не блокируя таблицу одним большим DELETE'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        expired = OutstandingToken.objects.filter(
+            expires_at__lte=aware_utcnow()
+        ).order_by('pk')
+        total = 0
+        while True:
+            ids = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+            self.stdout.write(f'Удалено токенов: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, удалено истёкших токенов: {total}'
+        ))
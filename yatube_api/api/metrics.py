@@ -0,0 +1,36 @@
+import threading
+from collections import Counter
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def hit_rates(counters=None):
+    """
+    Доля попаданий для каждой пары счётчиков `<name>.hit`/`<name>.miss`
+    """
+    counters = snapshot() if counters is None else counters
+    rates = {}
+    for key in counters:
+        if not key.endswith('.hit'):
+            continue
+        name = key[:-len('.hit')]
+        hits = counters[key]
+        total = hits + counters.get(f'{name}.miss', 0)
+        rates[name] = round(hits / total, 4) if total else None
+    return rates
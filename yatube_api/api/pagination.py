@@ -0,0 +1,202 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.template import loader
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CommentPagination(LimitOffsetPagination):
+    """
+    Пагинация комментариев: без параметров отдаётся весь список,
+    размер страницы ограничен max_limit
+    """
+    max_limit = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (pub_date, id) в порядке убывания.
+
+    Курсор хранит ключ граничной записи, поэтому страница выбирается
+    условием `WHERE (pub_date, id) < (...)` по составному индексу,
+    а не `OFFSET N`: любая страница стоит столько же, сколько первая.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 10
+    max_limit = 100
+    date_field = 'pub_date'
+    invalid_cursor_message = 'Некорректный курсор'
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # поле даты ключа может переопределить view (keyset_date_field)
+        self.date_field = getattr(view, 'keyset_date_field', self.date_field)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        reverse, position = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by(self.date_field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{self.date_field}', '-pk')
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(
+                position, reverse
+            ))
+
+        results = list(queryset[:self.limit + 1])
+        self.page = results[:self.limit]
+        has_following = len(results) > self.limit
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        if (self.has_next or self.has_previous) and self.template:
+            self.display_page_controls = True
+        return self.page
+
+    def position_filter(self, position, reverse):
+        pub_date, pk = position
+        date_field = self.date_field
+        if reverse:
+            return Q(**{f'{date_field}__gte': pub_date}) & (
+                Q(**{f'{date_field}__gt': pub_date}) | Q(pk__gt=pk)
+            )
+        return Q(**{f'{date_field}__lte': pub_date}) & (
+            Q(**{f'{date_field}__lt': pub_date}) | Q(pk__lt=pk)
+        )
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit,
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_position(self, instance):
+        # страница может состоять из словарей QuerySet.values()
+        if isinstance(instance, dict):
+            return instance[self.date_field], instance['pk']
+        return getattr(instance, self.date_field), instance.pk
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            tokens = parse.parse_qs(
+                b64decode(encoded.encode('ascii')).decode('ascii')
+            )
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            pub_date = parse_datetime(tokens['d'][0])
+            pk = int(tokens['p'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (pub_date, pk)
+
+    def encode_cursor(self, position, reverse=False):
+        pub_date, pk = position
+        tokens = {'d': pub_date.isoformat(), 'p': pk}
+        if reverse:
+            tokens['r'] = 1
+        encoded = b64encode(
+            parse.urlencode(tokens).encode('ascii')
+        ).decode('ascii')
+        url = replace_query_param(
+            self.base_url, self.limit_query_param, self.limit
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page[0]), reverse=True
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+    def to_html(self):
+        return loader.get_template(self.template).render(
+            self.get_html_context()
+        )
+
+
+class PostPagination(LimitOffsetPagination):
+    """
+    Пагинация ленты постов.
+
+    По умолчанию работает как limit/offset; если в запросе есть параметр
+    `cursor` (для первой страницы — пустой), включается KeysetPagination.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
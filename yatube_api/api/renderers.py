@@ -0,0 +1,64 @@
+"""
+Рендерер JSON на orjson.
+
+Если orjson не установлен, а также для ответов с отступами
+(?format=json с `indent`, Browsable API) и при UNICODE_JSON = False /
+COMPACT_JSON = False используется стандартный JSONRenderer на json.
+Вывод обоих путей совпадает; FieldFile (ImageField) отдаётся URL файла
+"""
+from django.db.models.fields.files import FieldFile
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, FieldFile):
+            return obj.url if obj else None
+        return super().default(obj)
+
+
+_encoder = JSONEncoder()
+
+
+def default(obj):
+    """
+    Типы, которые orjson не сериализует сам (lazy-строки, Decimal,
+    QuerySet и т.п.), приводятся как в JSONEncoder DRF
+    """
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    encoder_class = JSONEncoder
+    # 'Z' вместо '+00:00' и нестроковые ключи словарей, как в json
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def use_orjson(self, indent):
+        return (
+            orjson is not None
+            and indent is None
+            and self.compact
+            and not self.ensure_ascii
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not self.use_orjson(indent):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            # например, целые больше 64 бит
+            return super().render(data, accepted_media_type, renderer_context)
+        # как JSONRenderer: JSON должен оставаться подмножеством JavaScript
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
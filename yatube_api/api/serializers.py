@@ -1,6 +1,12 @@
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
+from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from PIL import Image
 
 
 from posts.models import (
@@ -9,19 +15,83 @@ from posts.models import (
     Group,
     Follow,
 )
+from .sparse import SparseFieldsMixin
 
 User = get_user_model()
 
 
-class PostSerializer(serializers.ModelSerializer):
+def build_file_url(storage, name, request=None):
+    url = storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+class ImageHeaderField(forms.ImageField):
+    """
+    Проверка загруженного изображения только по заголовку, без
+    декодирования: полностью файл разбирает фоновая обработка
+    posts.images
+    """
+
+    def to_python(self, data):
+        file = forms.FileField.to_python(self, data)
+        if file is None:
+            return None
+        if hasattr(data, 'temporary_file_path'):
+            source = data.temporary_file_path()
+        else:
+            source = data
+        try:
+            with Image.open(source) as image:
+                file.content_type = Image.MIME.get(image.format)
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image'
+            ) from exc
+        if hasattr(file, 'seek') and callable(file.seek):
+            file.seek(0)
+        return file
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """
+    Пути миниатюр изображения поста -> их URL
+    """
+
+    def to_representation(self, value):
+        storage = Post._meta.get_field('image').storage
+        request = self.context.get('request')
+        return {
+            size: build_file_url(storage, name, request)
+            for size, name in value.items()
+        }
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
+    image = serializers.ImageField(
+        required=False, allow_null=True, _DjangoImageField=ImageHeaderField
+    )
+    thumbnails = ThumbnailsField()
 
     class Meta:
-        fields = ('id', 'author', 'text', 'pub_date', 'image', 'group')
+        fields = (
+            'id', 'author', 'text', 'pub_date', 'image', 'group',
+            'comments_count', 'image_status', 'thumbnails',
+        )
         model = Post
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class BulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.API_BULK_MAX_ITEMS,
+    )
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -32,13 +102,28 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'title', 'slug', 'description')
         model = Group
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class UserStatsSerializer(serializers.ModelSerializer):
+    """
+    Счётчики пользователя из UserStats (аннотации UserStatsViewSet)
+    """
+    posts_count = serializers.IntegerField(read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+    following_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        fields = (
+            'username', 'posts_count', 'followers_count', 'following_count'
+        )
+        model = User
+
+
+class FollowSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -66,25 +151,20 @@ class FollowSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, attrs):
-        """
-        Нельзя подписаться на одного пользователя дважды
-        """
-        user = self.context['request'].user
-        if Follow.objects.filter(
-            user=user,
-            following=attrs['following']
-        ).exists():
-            raise serializers.ValidationError(
-                'Вы уже подписаны на этого пользователя'
-            )
-        return attrs
-
     def create(self, validated_data):
         """
-        Создание подписки
+        Создание подписки. Повторную подписку отсекает ограничение
+        unique_follow, без отдельной проверки и гонки между запросами
         """
-        return Follow.objects.create(
-            user=self.context['request'].user,
-            following=validated_data['following'],
-        )
+        try:
+            with transaction.atomic():
+                return Follow.objects.create(
+                    user=self.context['request'].user,
+                    following=validated_data['following'],
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже подписаны на этого пользователя'
+                ],
+            })
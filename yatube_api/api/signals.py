@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Now
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from posts.models import Comment, Group, Post
+from .authentication import user_cache_key
+from .cache import (
+    bump_version,
+    comments_namespace,
+    get_cache,
+    post_namespace,
+)
+from .tokens import blacklist
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=Group)
+def invalidate_groups(sender, signal, **kwargs):
+    """
+    Сброс кэша ответов GroupViewSet; удаление группы обнуляет group
+    у её постов без сигналов Post
+    """
+    bump_version('groups')
+    if signal is post_delete:
+        bump_version('posts')
+
+
+@receiver(pre_delete, sender=Group)
+def touch_group_posts(sender, instance, **kwargs):
+    """
+    SET_NULL обнуляет group постов запросом UPDATE мимо auto_now
+    """
+    Post.objects.filter(group=instance).update(updated=Now())
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_posts(sender, **kwargs):
+    """
+    Сброс кэша ответов PostViewSet: списков и всех постов
+    """
+    bump_version('posts')
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_comments(sender, instance, signal, created=False, **kwargs):
+    """
+    Сброс ветки комментариев. Новый или удалённый комментарий меняет
+    comments_count, поэтому сбрасывается и кэш самого поста; в
+    закэшированных списках постов счётчик догонит API_CACHE_TIMEOUT
+    """
+    bump_version(comments_namespace(instance.post_id))
+    if created or signal is post_delete:
+        bump_version(post_namespace(instance.post_id))
+
+
+@receiver(pre_save, sender=User)
+def check_username_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Меняется ли имя пользователя: сохранение last_login при входе
+    и новые пользователи кэш ответов не затрагивают
+    """
+    instance._username_changed = False
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance._username_changed = (
+        username is not None and username != instance.username
+    )
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_auth_user(sender, instance, signal, created=False, **kwargs):
+    """
+    Сброс закэшированного пользователя, в том числе при деактивации.
+    Имя автора есть в постах и комментариях, поэтому их кэш
+    сбрасывается только при смене имени или удалении
+    """
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    get_cache().delete(user_cache_key(user_id))
+    if signal is post_delete:
+        bump_version('users')
+    elif not created and getattr(instance, '_username_changed', False):
+        bump_version('users')
+        # имя автора есть в ответах: меняются их валидаторы
+        Post.objects.filter(author=instance).update(updated=Now())
+        Comment.objects.filter(author=instance).update(updated=Now())
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist(sender, instance, created, **kwargs):
+    """
+    Отозванный токен сразу попадает в множество текущего процесса
+    """
+    if created:
+        blacklist.add(instance.token.jti)
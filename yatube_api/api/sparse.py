@@ -0,0 +1,90 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import SlugRelatedField
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def is_sparse_request(request):
+    return request is not None and request.method == 'GET' and (
+        FIELDS_PARAM in request.query_params
+        or OMIT_PARAM in request.query_params
+    )
+
+
+def select_fields(request, available):
+    """
+    Имена полей из available, оставшиеся после ?fields= и ?omit=;
+    неизвестные имена игнорируются
+    """
+    selected = list(available)
+    if FIELDS_PARAM in request.query_params:
+        requested = set(parse_list(request.query_params[FIELDS_PARAM]))
+        selected = [name for name in selected if name in requested]
+    if OMIT_PARAM in request.query_params:
+        omitted = set(parse_list(request.query_params[OMIT_PARAM]))
+        selected = [name for name in selected if name not in omitted]
+    return selected
+
+
+class SparseFieldsMixin:
+    """
+    Сериализатор, отдающий только поля из ?fields= без полей из ?omit=.
+    Работает только для GET-запросов: запись всегда видит все поля
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if not is_sparse_request(request):
+            return
+        selected = set(select_fields(request, self.fields))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    def get_only_fields(self):
+        """
+        Пути полей модели для QuerySet.only() и связи для select_related()
+        под текущий набор полей; None, если поле не сводится к колонке
+        """
+        opts = self.Meta.model._meta
+        only, related = {'pk'}, set()
+        for field in self.fields.values():
+            if isinstance(field, SlugRelatedField):
+                related.add(field.source)
+                only.update((
+                    field.source, f'{field.source}__{field.slug_field}'
+                ))
+                continue
+            try:
+                opts.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            only.add(field.source)
+        return only, related
+
+
+class SparseFieldsViewMixin:
+    """
+    Сужает SQL-запрос до полей, которые попадут в ответ.
+    sparse_required_fields загружаются всегда (например, ключ пагинации)
+    """
+    sparse_required_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_sparse_request(self.request):
+            return queryset
+        narrowed = self.get_serializer().get_only_fields()
+        if narrowed is None:
+            return queryset
+        only, related = narrowed
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only, *self.sparse_required_fields)
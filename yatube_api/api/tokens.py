@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens, views
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from . import metrics
+
+
+class BlacklistSet:
+    """
+    Множество jti отозванных токенов в памяти процесса.
+
+    Перечитывается из BlacklistedToken раз в JWT_BLACKLIST_REFRESH_INTERVAL
+    секунд; между перечитываниями проверка токена не обращается к БД.
+    Токены, отозванные в другом процессе, становятся недействительными
+    здесь не позже следующего перечитывания
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = frozenset()
+        self._loaded_at = None
+
+    def is_stale(self):
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at
+            >= settings.JWT_BLACKLIST_REFRESH_INTERVAL
+        )
+
+    def reload(self):
+        jtis = frozenset(BlacklistedToken.objects.filter(
+            token__expires_at__gt=aware_utcnow()
+        ).values_list('token__jti', flat=True))
+        with self._lock:
+            self._jtis = jtis
+            self._loaded_at = time.monotonic()
+        metrics.incr('jwt_blacklist.reload')
+
+    def add(self, jti):
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def clear(self):
+        with self._lock:
+            self._jtis = frozenset()
+            self._loaded_at = None
+
+    def __contains__(self, jti):
+        if self.is_stale():
+            self.reload()
+        return jti in self._jtis
+
+
+blacklist = BlacklistSet()
+
+
+def memory_mode():
+    return settings.JWT_BLACKLIST_MODE == 'memory'
+
+
+def check_blacklist(token):
+    if token.payload[api_settings.JTI_CLAIM] in blacklist:
+        raise TokenError(_('Token is blacklisted'))
+
+
+class RefreshToken(tokens.RefreshToken):
+    def check_blacklist(self):
+        if not memory_mode():
+            return super().check_blacklist()
+        check_blacklist(self)
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenVerifySerializer(serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = tokens.UntypedToken(attrs['token'])
+        if memory_mode() and token.get(
+            api_settings.TOKEN_TYPE_CLAIM
+        ) == RefreshToken.token_type:
+            check_blacklist(token)
+        return {}
+
+
+class TokenRefreshView(views.TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class TokenVerifyView(views.TokenVerifyView):
+    serializer_class = TokenVerifySerializer
@@ -1,18 +1,33 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import tokens, views
 
 
 router = DefaultRouter()
 router.register(r'posts', views.PostViewSet)
 router.register(r'groups', views.GroupViewSet)
 router.register(r'follow', views.FollowViewSet)
+router.register(r'feed', views.FeedViewSet, basename='feed')
+router.register(r'users', views.UserStatsViewSet)
 router.register(r'posts\/(?P<post_id>\d+)\/comments', views.CommentViewSet)
 
 
 urlpatterns = [
     path('v1/', include(router.urls)),
+    path('v1/metrics/', views.MetricsView.as_view()),
+    path('v1/export/', views.ExportView.as_view()),
+    # refresh и verify с проверкой отзыва по JWT_BLACKLIST_MODE
+    re_path(
+        r'^v1/jwt/refresh/?',
+        tokens.TokenRefreshView.as_view(),
+        name='jwt-refresh',
+    ),
+    re_path(
+        r'^v1/jwt/verify/?',
+        tokens.TokenVerifyView.as_view(),
+        name='jwt-verify',
+    ),
     path('v1/', include('djoser.urls.jwt')),
     # path(
     #     'v1/posts/',
@@ -1,18 +1,53 @@
-from rest_framework import viewsets, mixins, filters, permissions
-from rest_framework.pagination import LimitOffsetPagination
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, mixins, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
 
+from . import export, metrics
+from .cache import (
+    CachedResponseMixin,
+    bump_version,
+    comments_namespace,
+    post_namespace,
+)
+from .conditional import ConditionalListMixin
+from .fast_serializers import (
+    FastCommentSerializer,
+    FastFollowSerializer,
+    FastGroupSerializer,
+    FastListMixin,
+    FastPostSerializer,
+)
+from .filters import IndexedSearchFilter
+from .parsers import FastJSONParser, NDJSONParser
+from .pagination import (
+    CommentPagination,
+    KeysetPagination,
+    PostPagination,
+)
 from .permissions import (
     OwnerOrReadOnly,
     ReadOnly
 )
+from .sparse import SparseFieldsViewMixin, parse_list
 from .serializers import (
+    BulkDeleteSerializer,
     PostSerializer,
     CommentSerializer,
     GroupSerializer,
     FollowSerializer,
+    UserStatsSerializer,
 )
+from posts import counters, images, timeline
 from posts.models import (
     Post,
     Comment,
@@ -20,70 +55,319 @@ from posts.models import (
     Follow,
 )
 
+User = get_user_model()
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+
+class PostViewSet(
+    CachedResponseMixin,
+    ConditionalListMixin,
+    FastListMixin,
+    SparseFieldsViewMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Post.objects.select_related('author')
+    sparse_required_fields = ('pub_date', )
     serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
     permission_classes = (OwnerOrReadOnly, )
-    pagination_class = LimitOffsetPagination
+    pagination_class = PostPagination
+    conditional_date_field = 'pub_date'
+    cache_namespace = 'posts'
+    # в ответе есть имена авторов
+    cache_dependencies = ('users', )
+
+    def get_cache_namespace(self):
+        # пост кэшируется в своём пространстве: комментарии к нему
+        # сбрасывают только его, а не все списки постов
+        pk = self.kwargs.get(self.lookup_field, '')
+        if self.action == 'retrieve' and pk.isdigit():
+            return post_namespace(int(pk))
+        return self.cache_namespace
+
+    def get_cache_dependencies(self):
+        if self.action == 'retrieve':
+            return (self.cache_namespace, *self.cache_dependencies)
+        return self.cache_dependencies
+
+    def save_post(self, serializer):
+        post = serializer.save(
+            author=self.request.user,
+            **images.status_fields(serializer.validated_data)
+        )
+        if post.image_status == Post.IMAGE_PENDING:
+            images.schedule(post.id)
+        return post
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = self.save_post(serializer)
+        timeline.fan_out(post)
 
     def perform_update(self, serializer):
-        serializer.save(author=self.request.user)
+        self.save_post(serializer)
+
+    def perform_destroy(self, instance):
+        with counters.deleting((instance.pk, )):
+            instance.delete()
 
     def get_permissions(self):
         if self.action == 'retrieve':
             return (ReadOnly(), )
         return super().get_permissions()
 
+    @action(
+        detail=False, methods=['post'], url_path='bulk',
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk_create(self, request):
+        """
+        Создание постов из JSON-массива или NDJSON одной транзакцией:
+        при ошибке в любом элементе не создаётся ничего, а в ответе -
+        ошибки по позициям элементов
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Ожидается список постов']
+            })
+        if len(request.data) > settings.API_BULK_MAX_ITEMS:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Не больше %d постов в запросе'
+                    % settings.API_BULK_MAX_ITEMS
+                ]
+            })
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        posts = []
+        for data in serializer.validated_data:
+            # файлы в JSON не передаются
+            data.pop('image', None)
+            posts.append(Post(author=request.user, **data))
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Post.objects.bulk_create(
+                    posts, batch_size=settings.API_BULK_BATCH_SIZE
+                )
+                # bulk_create не отправляет сигналы post_save
+                counters.change_stats(
+                    request.user.id, posts_count=len(posts)
+                )
+                transaction.on_commit(
+                    lambda: bump_version(self.cache_namespace)
+                )
+            else:
+                # без RETURNING (SQLite) pk новых строк надёжно не узнать:
+                # параллельные вставки того же автора перемешали бы id
+                for post in posts:
+                    post.save()
+            timeline.fan_out_many(posts)
+        return Response(
+            self.get_serializer(posts, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Удаление своих постов по списку id; в ответе - удалённые id,
+        ненайденные и чужие
+        """
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        with transaction.atomic():
+            owners = dict(Post.objects.filter(id__in=ids).values_list(
+                'id', 'author_id'
+            ))
+            deleted = sorted(
+                pk for pk, author_id in owners.items()
+                if author_id == request.user.id
+            )
+            with counters.deleting(deleted):
+                Post.objects.filter(id__in=deleted).delete()
+        return Response({
+            'deleted': deleted,
+            'not_found': sorted(ids - owners.keys()),
+            'forbidden': sorted(
+                pk for pk, author_id in owners.items()
+                if author_id != request.user.id
+            ),
+        })
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+
+class GroupViewSet(
+    CachedResponseMixin,
+    FastListMixin,
+    SparseFieldsViewMixin,
+    viewsets.ReadOnlyModelViewSet
+):
+    cache_namespace = 'groups'
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    fast_serializer_class = FastGroupSerializer
     permission_classes = (permissions.AllowAny, )
 
 
+class UserStatsViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Количество постов, подписчиков и подписок пользователя
+    """
+    # пользователь без строки UserStats - нули
+    queryset = User.objects.annotate(**{
+        field: Coalesce(F(f'stats__{field}'), 0)
+        for field in ('posts_count', 'followers_count', 'following_count')
+    })
+    serializer_class = UserStatsSerializer
+    permission_classes = (permissions.AllowAny, )
+    lookup_field = 'username'
+    lookup_value_regex = r'[\w.@+-]+'
+
+
 class FollowViewSet(
+    FastListMixin,
+    SparseFieldsViewMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
 ):
-    queryset = Follow.objects.all()
+    queryset = Follow.objects.select_related('user', 'following')
     serializer_class = FollowSerializer
+    fast_serializer_class = FastFollowSerializer
     permission_classes = (permissions.IsAuthenticated, )
-    filter_backends = (filters.SearchFilter, )
+    filter_backends = (IndexedSearchFilter, )
     search_fields = ('following__username', )
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class FeedViewSet(
+    FastListMixin,
+    SparseFieldsViewMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet
+):
+    serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
+    sparse_required_fields = ('pub_date', )
+    permission_classes = (permissions.IsAuthenticated, )
+    pagination_class = KeysetPagination
+
+    @property
+    def keyset_date_field(self):
+        return 'feed_date' if timeline.enabled() else 'pub_date'
+
+    def get_queryset(self):
+        user = self.request.user
+        if timeline.enabled():
+            return Post.objects.filter(
+                timeline_entries__user=user
+            ).annotate(
+                feed_date=F('timeline_entries__pub_date')
+            ).select_related('author')
+        # лента собирается одним запросом: author_id IN (подзапрос)
+        followings = Follow.objects.filter(user=user).values('following_id')
+        return Post.objects.filter(
+            author_id__in=followings
+        ).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        if timeline.enabled() and not request.query_params.get('cursor'):
+            timeline.trim(request.user.id)
+        return super().list(request, *args, **kwargs)
+
+
+class CommentViewSet(
+    CachedResponseMixin,
+    ConditionalListMixin,
+    FastListMixin,
+    SparseFieldsViewMixin,
+    viewsets.ModelViewSet
+):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    fast_serializer_class = FastCommentSerializer
     permission_classes = (OwnerOrReadOnly, )
+    pagination_class = CommentPagination
+    conditional_date_field = 'created'
+    # ветка комментариев кэшируется целиком, ключи версионируются по посту;
+    # общая версия 'comments' сбрасывает все ветки сразу (import_yatube)
+    cache_actions = ('list', )
+    cache_dependencies = ('users', 'comments')
+
+    def get_cache_namespace(self):
+        return comments_namespace(self.kwargs.get('post_id'))
 
     def get_queryset(self):
         post_id = self.kwargs.get('post_id')
-        return Comment.objects.filter(post_id=post_id)
+        return Comment.objects.filter(
+            post_id=post_id
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        post_id = self.kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
-        serializer.save(author=self.request.user, post=post)
+        post_id = int(self.kwargs.get('post_id'))
+        if not Post.objects.filter(id=post_id).exists():
+            raise NotFound('Пост не найден')
+        serializer.save(author=self.request.user, post_id=post_id)
 
     def perform_update(self, serializer):
-        post_id = self.kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
-        serializer.save(author=self.request.user, post=post)
+        # комментарий уже найден в get_queryset() по post_id из URL
+        serializer.save(author=self.request.user)
 
     def get_permissions(self):
         if self.action == 'retrieve':
             return (ReadOnly(), )
         return super().get_permissions()
 
+
+class ExportView(APIView):
+    """
+    Выгрузка постов и комментариев в NDJSON потоком.
+    ?models=posts,comments, ?author=<username>, ?group=<slug>,
+    ?since= и ?until= (дата или дата и время ISO 8601)
+    """
+    permission_classes = (permissions.IsAdminUser, )
+
+    def get(self, request):
+        names = parse_list(request.query_params.get('models', '')) or list(
+            export.EXPORTS
+        )
+        unknown = set(names) - set(export.EXPORTS)
+        if unknown:
+            raise ValidationError({'models': [
+                'Неизвестные выгрузки: %s' % ', '.join(sorted(unknown))
+            ]})
+        try:
+            filters = export.parse_filters(
+                **{
+                    name: request.query_params.get(name)
+                    for name in ('author', 'group', 'since', 'until')
+                }
+            )
+        except ValueError as exc:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                str(exc)
+            ]})
+        response = StreamingHttpResponse(
+            export.export_lines(names, filters, request),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="yatube-export.ndjson"'
+        )
+        return response
+
+
+class MetricsView(APIView):
+    permission_classes = (permissions.IsAdminUser, )
+
+    def get(self, request):
+        counters = metrics.snapshot()
+        return Response({
+            'counters': counters,
+            'hit_rates': metrics.hit_rates(counters),
+        })
+
 # @api_view(['GET', 'POST'])
 # def api_posts(request: HttpRequest):
 #     if request.method == 'GET':
@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from .models import Post, UserStats
+
+# посты, удаляемые в текущем потоке: каскадное удаление их комментариев
+# не должно обновлять счётчик удаляемой строки
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'ids'):
+        _deleting.ids = set()
+    return _deleting.ids
+
+
+@contextmanager
+def deleting(post_ids):
+    """
+    Отметка удаляемых постов на время удаления; снимается и при
+    ошибке или откате, иначе счётчик поста перестал бы обновляться
+    """
+    ids = deleting_posts()
+    added = set(post_ids) - ids
+    ids.update(added)
+    try:
+        yield
+    finally:
+        ids.difference_update(added)
+
+
+def shifted(field, delta):
+    """
+    F(field) + delta, но не меньше нуля: после bulk_create и до
+    reconcile_counters счётчик может отставать, а поле положительное
+    """
+    if delta >= 0:
+        return F(field) + delta
+    return Greatest(F(field) + delta, 0)
+
+
+def change_comments_count(post_id, delta):
+    if post_id in deleting_posts():
+        return
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shifted('comments_count', delta), updated=Now()
+    )
+
+
+def change_stats(user_id, **deltas):
+    """
+    Атомарно меняет счётчики UserStats на deltas;
+    строка создаётся при первом увеличении
+    """
+    updates = {
+        field: shifted(field, delta) for field, delta in deltas.items()
+    }
+    if UserStats.objects.filter(user_id=user_id).update(**updates):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        # строки нет - считать нечего, поправит reconcile_counters
+        return
+    UserStats.objects.get_or_create(user_id=user_id)
+    UserStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('pk')).values('total')
+        ),
+        Value(0),
+    )
+
+
+def reconcile(user_model, post_model, comment_model, follow_model,
+              stats_model, start=None, stop=None):
+    """
+    Пересчитывает счётчики по данным для pk из [start, stop).
+    Модели передаются явно, чтобы функцию можно было вызвать из миграции
+    """
+    bounds = {}
+    if start is not None:
+        bounds['pk__gte'] = start
+    if stop is not None:
+        bounds['pk__lt'] = stop
+
+    post_model.objects.filter(**bounds).update(
+        comments_count=count_of(comment_model, 'post')
+    )
+    stats_model.objects.bulk_create(
+        (
+            stats_model(user_id=user_id)
+            for user_id in user_model.objects.filter(
+                **bounds, stats__isnull=True
+            ).values_list('pk', flat=True)
+        ),
+        ignore_conflicts=True,
+    )
+    stats_model.objects.filter(**bounds).update(
+        posts_count=count_of(post_model, 'author'),
+        followers_count=count_of(follow_model, 'following'),
+        following_count=count_of(follow_model, 'user'),
+    )
@@ -0,0 +1,141 @@
+"""
+Фоновая обработка изображений постов.
+
+Запрос только сохраняет загруженный файл (он уже лежит во временном
+файле, см. FILE_UPLOAD_HANDLERS) и ставит пост в очередь со статусом
+pending. Миниатюры POST_IMAGE_SIZES строятся в пуле из
+POST_IMAGE_WORKERS потоков после коммита транзакции; при
+POST_IMAGE_WORKERS = 0 - сразу после коммита в том же потоке.
+Очередь не переживает перезапуск: оставшиеся в pending посты
+дообрабатывает manage.py process_pending_images
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POST_IMAGE_WORKERS,
+                thread_name_prefix='post-images',
+            )
+        return _executor
+
+
+def thumbnail_name(name, size):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return f'posts/thumbnails/{size}/{stem}.jpg'
+
+
+def make_thumbnails(image_file, name, storage):
+    """
+    Сохраняет уменьшенные копии в JPEG, возвращает пути по размерам
+    """
+    thumbnails = {}
+    with Image.open(image_file) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for size, bounds in settings.POST_IMAGE_SIZES.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail(bounds)
+            buffer = BytesIO()
+            thumbnail.save(
+                buffer, 'JPEG', quality=settings.POST_IMAGE_QUALITY,
+                optimize=True,
+            )
+            thumbnails[size] = storage.save(
+                thumbnail_name(name, size), ContentFile(buffer.getvalue())
+            )
+    return thumbnails
+
+
+def process(post_id):
+    try:
+        post = Post.objects.get(pk=post_id)
+    except Post.DoesNotExist:
+        return
+    if not post.image:
+        return
+    storage = post.image.storage
+    for path in post.thumbnails.values():
+        storage.delete(path)
+    try:
+        with post.image.open('rb'):
+            post.thumbnails = make_thumbnails(
+                post.image, post.image.name, storage
+            )
+        post.image_status = Post.IMAGE_READY
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception('Не удалось обработать изображение поста %s', post_id)
+        post.thumbnails = {}
+        post.image_status = Post.IMAGE_FAILED
+    try:
+        # save(), а не update(): сигналы сбрасывают кэши API
+        post.save(update_fields=('image_status', 'thumbnails', 'updated'))
+    except DatabaseError:
+        # пост удалён во время обработки
+        for path in post.thumbnails.values():
+            storage.delete(path)
+
+
+def uploaded_at(post):
+    """
+    Время загрузки изображения по хранилищу; None, если неизвестно
+    """
+    try:
+        return post.image.storage.get_modified_time(post.image.name)
+    except (NotImplementedError, OSError):
+        return None
+
+
+def _process_in_worker(post_id):
+    try:
+        process(post_id)
+    except Exception:
+        logger.exception('Ошибка фоновой обработки поста %s', post_id)
+    finally:
+        connections.close_all()
+
+
+def schedule(post_id):
+    """
+    Обработка изображения после коммита текущей транзакции
+    """
+    def submit():
+        if settings.POST_IMAGE_WORKERS:
+            get_executor().submit(_process_in_worker, post_id)
+        else:
+            process(post_id)
+
+    transaction.on_commit(submit)
+
+
+def status_fields(validated_data):
+    """
+    Поля поста для сохранения: новое изображение ждёт обработки,
+    удалённое - сбрасывает статус и миниатюры
+    """
+    if 'image' not in validated_data:
+        return {}
+    return {
+        'image_status': (
+            Post.IMAGE_PENDING if validated_data['image'] else ''
+        ),
+        'thumbnails': {},
+    }
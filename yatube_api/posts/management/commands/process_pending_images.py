@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import images
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает изображения постов, оставшиеся в статусе pending: '
+        'очередь фоновой обработки живёт в памяти процесса и теряется '
+        'при перезапуске'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=600,
+            help='Секунд с загрузки изображения; более свежие, '
+                 'вероятно, ещё в очереди и пропускаются',
+        )
+
+    def handle(self, *args, min_age, **options):
+        border = timezone.now() - timedelta(seconds=min_age)
+        processed = skipped = 0
+        posts = Post.objects.filter(
+            image_status=Post.IMAGE_PENDING
+        ).only('id', 'image')
+        for post in posts.iterator():
+            uploaded = images.uploaded_at(post)
+            if uploaded is not None and uploaded > border:
+                skipped += 1
+                continue
+            images.process(post.id)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}, пропущено: {skipped}'
+        ))
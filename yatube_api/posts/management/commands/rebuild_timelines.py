@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает предвычисленные ленты всех подписчиков; '
+        'нужно после включения FEED_BACKEND = "timeline"'
+    )
+
+    def handle(self, *args, **options):
+        user_ids = Follow.objects.order_by('user_id').values_list(
+            'user_id', flat=True
+        ).distinct()
+        total = 0
+        for user_id in user_ids.iterator():
+            timeline.rebuild(user_id)
+            total += 1
+            if total % 1000 == 0:
+                self.stdout.write(f'Пересобрано лент: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, пересобрано лент: {total}'
+        ))
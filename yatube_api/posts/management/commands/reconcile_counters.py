@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from posts.counters import reconcile
+from posts.models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает Post.comments_count и UserStats по данным; '
+        'обрабатывает строки диапазонами pk по --batch-size'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, batch_size, **options):
+        last_pk = max(
+            Post.objects.aggregate(last=Max('pk'))['last'] or 0,
+            User.objects.aggregate(last=Max('pk'))['last'] or 0,
+        )
+        for start in range(0, last_pk + 1, batch_size):
+            with transaction.atomic():
+                reconcile(
+                    User, Post, Comment, Follow, UserStats,
+                    start=start, stop=start + batch_size,
+                )
+            self.stdout.write(
+                f'Пересчитано до pk {min(start + batch_size, last_pk + 1)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрезает предвычисленные ленты до TIMELINE_MAX_LENGTH записей; '
+        'для периодического запуска, например из cron'
+    )
+
+    def handle(self, *args, **options):
+        user_ids = TimelineEntry.objects.order_by('user_id').values_list(
+            'user_id', flat=True
+        ).distinct()
+        total = 0
+        for user_id in user_ids.iterator():
+            timeline.trim(user_id)
+            total += 1
+            if total % 1000 == 0:
+                self.stdout.write(f'Обрезано лент: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, обрезано лент: {total}'
+        ))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# индекс для регистронезависимого поиска подписок по username,
+# модель пользователя не наша, поэтому индекс создаётся вручную
+USERNAME_LOWER_INDEX = models.Index(
+    Lower('username'), name='user_username_lower_idx'
+)
+
+
+def add_index(apps, schema_editor):
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.add_index(user_model, USERNAME_LOWER_INDEX)
+
+
+def remove_index(apps, schema_editor):
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.remove_index(user_model, USERNAME_LOWER_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0005_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
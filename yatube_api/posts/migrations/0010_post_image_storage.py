@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:23
+
+from django.db import migrations, models
+import posts.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image_processing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=posts.storage.get_image_storage, upload_to='posts/'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:21
+
+from django.conf import settings
+from django.db import migrations
+
+# поиск по префиксу в PostgreSQL идёт через LIKE 'term%': индекс
+# user_username_lower_idx для него не годится при сортировке не C
+INDEX_NAME = 'user_username_lower_pattern_idx'
+
+
+def add_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        'CREATE INDEX %s ON %s (LOWER(%s) text_pattern_ops)' % (
+            quote(INDEX_NAME),
+            quote(user_model._meta.db_table),
+            quote(user_model._meta.get_field('username').column),
+        )
+    )
+
+
+def remove_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS %s' % schema_editor.quote_name(INDEX_NAME)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
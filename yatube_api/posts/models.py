@@ -1,20 +1,53 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import get_image_storage
+
 User = get_user_model()
 
 
 class Post(models.Model):
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUSES = (
+        (IMAGE_PENDING, 'Обрабатывается'),
+        (IMAGE_READY, 'Готово'),
+        (IMAGE_FAILED, 'Ошибка обработки'),
+    )
+
     text = models.TextField()
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
-        upload_to='posts/', null=True, blank=True)
+        upload_to='posts/', storage=get_image_storage, null=True, blank=True)
+    # заполняются фоновой обработкой posts.images;
+    # пустой статус - изображения нет или оно загружено до обработки
+    image_status = models.CharField(
+        'Статус изображения', max_length=16, choices=IMAGE_STATUSES,
+        blank=True, editable=False)
+    thumbnails = models.JSONField(
+        'Миниатюры', default=dict, blank=True, editable=False)
     group = models.ForeignKey(
         'Group', on_delete=models.SET_NULL, related_name='posts',
         null=True, blank=True,
     )
+    # поддерживается сигналами posts.signals
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
+    # любое изменение ответа API, в том числе comments_count и имени
+    # автора; по нему считаются валидаторы условного GET
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            # ключ keyset-пагинации ленты
+            models.Index(
+                fields=['pub_date', 'id'], name='post_pub_date_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -23,11 +56,23 @@ class Post(models.Model):
 class Comment(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
+    # отдельный индекс по post не нужен: его покрывает составной индекс
     post = models.ForeignKey(
-        Post, on_delete=models.CASCADE, related_name='comments')
+        Post, on_delete=models.CASCADE, related_name='comments',
+        db_index=False)
     text = models.TextField()
     created = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        ordering = ('created', 'id')
+        indexes = [
+            # комментарии поста в порядке добавления
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created_idx'
+            ),
+        ]
 
 
 class Group(models.Model):
@@ -48,10 +93,12 @@ class Group(models.Model):
 
 
 class Follow(models.Model):
+    # поиск по user обслуживает индекс ограничения unique_follow
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='follows',
+        db_index=False,
     )
     following = models.ForeignKey(
         User,
@@ -72,3 +119,57 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user.username} подписан на {self.following.username}'
+
+
+class UserStats(models.Model):
+    """
+    Счётчики пользователя, поддерживаются сигналами posts.signals
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+
+class TimelineEntry(models.Model):
+    """
+    Запись предвычисленной ленты пользователя (FEED_BACKEND = 'timeline')
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    # копия Post.pub_date, чтобы лента сортировалась по индексу записи
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
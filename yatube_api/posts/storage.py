@@ -0,0 +1,244 @@
+"""
+Хранилища изображений постов.
+
+Хранилище выбирается настройкой POST_IMAGE_STORAGE (путь к классу);
+Post.image получает его через вызываемый get_image_storage(), поэтому
+смена хранилища не требует миграций.
+
+ContentAddressedStorage - локальные файлы с именем из SHA-256
+содержимого, разложенные по подкаталогам: одинаковые файлы хранятся
+один раз. ObjectStorage - объектное хранилище с подмножеством API S3
+(put_object/get_object/head_object/delete_object); без ENDPOINT_URL
+вместо сервиса S3 используется LocalObjectClient, хранящий объекты
+в каталоге
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote, urljoin
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+CHUNK_SIZE = 64 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файл сохраняется как <каталог>/<ab>/<cd>/<sha256><расширение>:
+    повторная загрузка того же содержимого не пишет файл заново.
+    Файл может принадлежать нескольким записям, поэтому delete()
+    ничего не удаляет; имена неизменяемы и кэшируются клиентами навсегда
+    """
+    immutable = True
+
+    def hash_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:4], hexdigest + extension
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # имя уже уникально для содержимого
+        return name
+
+    def _save(self, name, content):
+        name = self.hash_name(name, content)
+        if self.exists(name):
+            return name
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # запись во временный файл и атомарная замена: параллельная
+        # загрузка того же содержимого пишет те же байты
+        fd, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
+
+    def delete(self, name):
+        pass
+
+
+class LocalObjectClient:
+    """
+    Подмножество клиента S3 (boto3) поверх локального каталога:
+    объект - файл, метаданные - JSON рядом с ним
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def object_path(self, bucket, key):
+        root = os.path.abspath(os.path.join(self.root, bucket))
+        path = os.path.abspath(os.path.join(root, *key.split('/')))
+        if not path.startswith(root + os.sep):
+            raise SuspiciousFileOperation(f'Недопустимый ключ: {key}')
+        return path
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        path = self.object_path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.md5()
+        with open(path, 'wb') as file:
+            for chunk in iter(lambda: Body.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                file.write(chunk)
+        etag = f'"{digest.hexdigest()}"'
+        with open(f'{path}.meta', 'w') as meta:
+            json.dump({'ContentType': ContentType, 'ETag': etag}, meta)
+        return {'ETag': etag}
+
+    def head_object(self, Bucket, Key):
+        path = self.object_path(Bucket, Key)
+        try:
+            stat = os.stat(path)
+            with open(f'{path}.meta') as meta:
+                head = json.load(meta)
+        except FileNotFoundError:
+            raise KeyError(Key)
+        head.update(
+            ContentLength=stat.st_size,
+            LastModified=datetime.fromtimestamp(
+                stat.st_mtime, tz=timezone.utc
+            ),
+        )
+        return head
+
+    def get_object(self, Bucket, Key):
+        head = self.head_object(Bucket, Key)
+        head['Body'] = open(self.object_path(Bucket, Key), 'rb')
+        return head
+
+    def delete_object(self, Bucket, Key):
+        path = self.object_path(Bucket, Key)
+        for name in (path, f'{path}.meta'):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+        return {}
+
+
+def is_missing(error):
+    # LocalObjectClient - KeyError, boto3 - ClientError с кодом 404
+    if isinstance(error, KeyError):
+        return True
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in (
+        '404', 'NoSuchKey', 'NotFound'
+    )
+
+
+@deconstructible
+class ObjectStorage(Storage):
+    """
+    Хранилище в бакете S3-совместимого сервиса (OBJECT_STORAGE)
+    """
+    immutable = False
+
+    def __init__(self, options=None):
+        self.options = options or settings.OBJECT_STORAGE
+        self.bucket = self.options['BUCKET']
+        self.base_url = self.options.get('BASE_URL') or settings.MEDIA_URL
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            endpoint_url = self.options.get('ENDPOINT_URL')
+            if endpoint_url and boto3 is not None:
+                self._client = boto3.client('s3', endpoint_url=endpoint_url)
+            else:
+                self._client = LocalObjectClient(self.options['ROOT'])
+        return self._client
+
+    def _open(self, name, mode='rb'):
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=name)
+        except Exception as error:
+            if is_missing(error):
+                raise FileNotFoundError(name)
+            raise
+        return File(body['Body'], name)
+
+    def _save(self, name, content):
+        content_type = (
+            getattr(content, 'content_type', None)
+            or mimetypes.guess_type(name)[0]
+        )
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        self.client.put_object(
+            Bucket=self.bucket, Key=name, Body=content,
+            ContentType=content_type,
+        )
+        return name
+
+    def head(self, name):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=name)
+        except Exception as error:
+            if is_missing(error):
+                return None
+            raise
+
+    def exists(self, name):
+        return self.head(name) is not None
+
+    def size(self, name):
+        return self.head(name)['ContentLength']
+
+    def get_modified_time(self, name):
+        return self.head(name)['LastModified']
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def url(self, name):
+        return urljoin(self.base_url, quote(name.replace('\\', '/')))
+
+
+@lru_cache(maxsize=None)
+def _storage(path):
+    return import_string(path)()
+
+
+def get_image_storage():
+    """
+    Хранилище Post.image из POST_IMAGE_STORAGE
+    """
+    return _storage(settings.POST_IMAGE_STORAGE)
@@ -0,0 +1,129 @@
+"""
+Предвычисленные ленты (fan-out on write).
+
+При FEED_BACKEND = 'timeline' новый пост раскладывается по лентам
+подписчиков автора, а /api/v1/feed/ читает готовую ленту из
+TimelineEntry вместо сборки по подпискам. Длина ленты ограничена
+TIMELINE_MAX_LENGTH записями: ленты обрезаются при чтении и при
+раскладке постов (с запасом TIMELINE_TRIM_SLACK), а trim_timelines
+обрезает все. Раскладка идёт синхронно, в запросе создания поста
+"""
+import random
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Follow, Post, TimelineEntry
+
+BATCH_SIZE = 1000
+
+
+def enabled():
+    return settings.FEED_BACKEND == 'timeline'
+
+
+def _insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out(post):
+    """
+    Добавляет пост в ленты всех подписчиков автора
+    """
+    fan_out_many([post])
+
+
+def fan_out_many(posts):
+    """
+    Добавляет посты одного автора в ленты его подписчиков
+    """
+    if not enabled() or not posts:
+        return
+    follower_ids = Follow.objects.filter(
+        following_id=posts[0].author_id
+    ).values_list('user_id', flat=True)
+    batch = []
+    for user_id in follower_ids.iterator(chunk_size=BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) * len(posts) >= BATCH_SIZE:
+            _fan_out_batch(batch, posts)
+            batch = []
+    if batch:
+        _fan_out_batch(batch, posts)
+
+
+def _fan_out_batch(user_ids, posts):
+    _insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in user_ids
+        for post in posts
+    )
+    # лента каждого обрезается в среднем раз на TIMELINE_TRIM_SLACK
+    # новых записей: длина ограничена и у тех, кто ленту не читает
+    chance = len(posts) / max(settings.TIMELINE_TRIM_SLACK, 1)
+    for user_id in user_ids:
+        if random.random() < chance:
+            trim(user_id)
+
+
+def backfill(user_id, author_id):
+    """
+    Добавляет в ленту последние посты автора, на которого подписались
+    """
+    if not enabled():
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.TIMELINE_MAX_LENGTH]
+    _insert(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts
+    )
+    trim(user_id)
+
+
+def remove_author(user_id, author_id):
+    """
+    Убирает из ленты посты автора после отписки
+    """
+    if not enabled():
+        return
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def trim(user_id):
+    """
+    Удаляет записи старше TIMELINE_MAX_LENGTH последних
+    """
+    max_length = settings.TIMELINE_MAX_LENGTH
+    boundary = TimelineEntry.objects.filter(user_id=user_id).order_by(
+        '-pub_date', '-post_id'
+    ).values_list('pub_date', 'post_id')[max_length:max_length + 1]
+    for pub_date, post_id in boundary:
+        TimelineEntry.objects.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lte=post_id),
+            user_id=user_id,
+        ).delete()
+
+
+def rebuild(user_id):
+    """
+    Собирает ленту пользователя заново по текущим подпискам
+    """
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    posts = Post.objects.filter(
+        author_id__in=Follow.objects.filter(
+            user_id=user_id
+        ).values('following_id')
+    ).order_by('-pub_date', '-id').values_list(
+        'id', 'pub_date'
+    )[:settings.TIMELINE_MAX_LENGTH]
+    _insert(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts
+    )
@@ -0,0 +1,124 @@
+import mimetypes
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_safe
+
+from .storage import CHUNK_SIZE, get_image_storage
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    (начало, конец включительно) из заголовка Range с одним диапазоном;
+    None - заголовок не поддерживается и отдаётся весь файл,
+    ValueError - диапазон за пределами файла
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # последние N байт
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(file, start, length):
+    try:
+        file.seek(start)
+    except (AttributeError, OSError):
+        # поток объектного хранилища без произвольного доступа
+        while start:
+            start -= len(file.read(min(start, CHUNK_SIZE)))
+    try:
+        while length:
+            chunk = file.read(min(length, CHUNK_SIZE))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def stream_file(request, storage, name, size, content_type):
+    """
+    Ответ с файлом хранилища целиком или диапазоном из заголовка Range
+    """
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = storage.open(name, 'rb')
+    if byte_range is None:
+        # wsgi.file_wrapper отдаёт файл через sendfile(), если может
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(file, start, end - start + 1),
+            status=206, content_type=content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, name):
+    """
+    Отдача файлов хранилища изображений частями, без чтения файла
+    в память целиком. При MEDIA_SERVE_MODE = 'x-accel-redirect' или
+    'x-sendfile' файл отдаёт веб-сервер, Django только проверяет его
+    наличие и выставляет заголовки. У хранилища без локальных путей
+    (ObjectStorage) x-sendfile невозможен, и файл отдаётся частями
+    """
+    storage = get_image_storage()
+    try:
+        if not storage.exists(name):
+            raise Http404('Файл не найден')
+        size = storage.size(name)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == 'x-sendfile':
+        try:
+            path = storage.path(name)
+        except NotImplementedError:
+            mode = 'stream'
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+        )
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = stream_file(request, storage, name, size, content_type)
+
+    if getattr(storage, 'immutable', False) and response.status_code < 400:
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -63,6 +63,13 @@ DATABASES = {
     }
 }
 
+# бэкенд можно заменить на Memcached/Redis без изменений в коде api
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,12 +98,54 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# загрузки пишутся во временный файл потоком, а не собираются в памяти
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# фоновая обработка изображений постов (posts.images):
+# число потоков (0 - в потоке запроса после коммита) и размеры миниатюр
+POST_IMAGE_WORKERS = 2
+POST_IMAGE_SIZES = {
+    'small': (320, 320),
+    'medium': (1280, 1280),
+}
+POST_IMAGE_QUALITY = 85
+
+# хранилище изображений постов (posts.storage):
+# 'posts.storage.ContentAddressedStorage' - файлы в MEDIA_ROOT по хэшу,
+# 'posts.storage.ObjectStorage' - бакет S3-совместимого хранилища
+POST_IMAGE_STORAGE = 'posts.storage.ContentAddressedStorage'
+# без ENDPOINT_URL (или без boto3) объекты хранятся в каталоге ROOT
+OBJECT_STORAGE = {
+    'BUCKET': 'yatube',
+    'ENDPOINT_URL': None,
+    'ROOT': BASE_DIR / 'objects',
+}
+# отдача MEDIA_URL: 'stream' - Django частями с поддержкой Range,
+# 'x-accel-redirect' (nginx) или 'x-sendfile' (Apache) - веб-сервером
+MEDIA_SERVE_MODE = 'stream'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    # orjson, если установлен; иначе стандартный json
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -105,4 +154,40 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# 'database' - проверка отзыва refresh-токена запросом к BlacklistedToken,
+# 'memory' - по множеству в памяти, перечитываемому раз в интервал:
+# токен, отозванный в другом процессе, действует до перечитывания
+JWT_BLACKLIST_MODE = 'database'
+JWT_BLACKLIST_REFRESH_INTERVAL = 60
+
+API_CACHE_ALIAS = 'default'
+# ответы API кэшируются только на общем для процессов бэкенде
+# (Redis, Memcached); True - и в памяти процесса, если он один
+API_CACHE_ALLOW_LOCAL = False
+API_CACHE_TIMEOUT = 60 * 5
+API_USER_CACHE_TIMEOUT = 60
+# блокировка заполнения холодного ключа: время жизни и ожидание, с
+API_CACHE_LOCK_TIMEOUT = 5
+API_CACHE_LOCK_POLL_INTERVAL = 0.05
+# досрочное обновление горячих ключей (XFetch): больше - раньше, 0 - нет
+API_CACHE_EARLY_REFRESH_BETA = 1.0
+# режим поиска по умолчанию: 'exact', 'prefix' или 'contains' (icontains)
+API_SEARCH_MODE = 'prefix'
+API_SEARCH_CASE_INSENSITIVE = True
+
+# 'query' - лента /api/v1/feed/ собирается запросом по подпискам,
+# 'timeline' - читается из лент, заполняемых при публикации поста
+FEED_BACKEND = 'query'
+TIMELINE_MAX_LENGTH = 500
+# ленты обрезаются при записи в среднем раз на столько новых записей
+TIMELINE_TRIM_SLACK = 50
+
+# списки отдаются через api.fast_serializers (строки .values())
+API_FAST_SERIALIZERS = True
+# /api/v1/posts/bulk/ и /bulk-delete/: записей в запросе и в одном INSERT
+API_BULK_MAX_ITEMS = 1000
+API_BULK_BATCH_SIZE = 500
+# строк на выборку из БД и на кусок ответа в выгрузке NDJSON (api.export)
+EXPORT_CHUNK_SIZE = 2000
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,12 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
 from rest_framework.authtoken.views import obtain_auth_token
 
+from posts.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:name>',
+        serve_media,
+        name='media'
+    ),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),